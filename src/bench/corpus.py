@@ -0,0 +1,62 @@
+"""Question corpora and latency summaries shared by the benchmarks and the
+load generator. Only the standard library and the CSV reader are needed, so
+the load generator can drive a remote API without the server's
+dependencies installed.
+"""
+import random
+import statistics
+
+from ..llm.ingest import parse_projects, read_rows
+
+QUESTION_TEMPLATES = [
+    "Who is {person}'s tech mentor?",
+    "Who are the tech mentee of {person}?",
+    "Who is the career mentor of {person}?",
+    "What department is {person} in?",
+    "Find project of {person}",
+    "Who are part of project {project}?",
+]
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def misspell(name: str, rng) -> str:
+    """Swaps two adjacent letters of the longest word, a typical typo."""
+    words = name.split()
+    index = max(range(len(words)), key=lambda i: len(words[i]))
+    word = words[index]
+    if len(word) >= 4:
+        i = rng.randrange(1, len(word) - 2)
+        words[index] = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return " ".join(words)
+
+
+def make_questions(path: str, count: int, seed: int, typos: bool = False):
+    rng = random.Random(seed)
+    people = []
+    projects = set()
+    for row in read_rows(path):
+        people.append(row["full_name"])
+        projects.update(parse_projects(row["project"]))
+    projects = sorted(projects)
+    spell = (lambda name: misspell(name, rng)) if typos else (lambda name: name)
+    return [rng.choice(QUESTION_TEMPLATES).format(person=spell(rng.choice(people)),
+                                                   project=spell(rng.choice(projects)))
+            for _ in range(count)]
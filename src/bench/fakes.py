@@ -0,0 +1,341 @@
+"""Deterministic stand-ins for the LLM providers and Neo4j.
+
+They let ``Service`` run end to end without network access so benchmark
+numbers only reflect our own code plus the configured fake latencies.
+"""
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from ..llm import ingest, snapshot
+from ..llm.intents import INTENTS, EntityIndex, IntentRouter, parameterize_name
+from ..llm.neo4j import Neo4j
+from ..llm.pruning import format_schema
+
+PERSON_PROPERTIES = ("id", "full_name", "position", "department", "career_mentor",
+                     "tech_mentor", "project")
+MENTOR_QUERIES = {
+    ingest.CAREER_MENTOR_QUERY: ("IS_CAREER_MENTOR_OF", "IS_CAREER_MENTEE_OF"),
+    ingest.TECH_MENTOR_QUERY: ("IS_TECH_MENTOR_OF", "IS_TECH_MENTEE_OF"),
+    ingest.COMPACT_CAREER_MENTOR_QUERY: ("IS_CAREER_MENTOR_OF", None),
+    ingest.COMPACT_TECH_MENTOR_QUERY: ("IS_TECH_MENTOR_OF", None),
+}
+
+# Neo4j record format sizes, used to estimate the store size.
+NODE_RECORD_BYTES = 15
+RELATIONSHIP_RECORD_BYTES = 34
+PROPERTY_RECORD_BYTES = 41
+PROPERTIES_PER_RECORD = 4
+
+PEOPLE_QUERY = "MATCH (p:Person) RETURN p.full_name AS name"
+PROJECTS_QUERY = "MATCH (p:Project) RETURN p.name AS name"
+
+
+def inline_name(cypher: str, name: str) -> str:
+    """Turns an intent query into what an LLM would typically generate."""
+    escaped = name.replace("\\", "\\\\").replace("'", "\\'")
+    return cypher.replace("$name", f"'{escaped}'")
+
+
+class InMemoryGraph:
+    """Answers the ingest writes, the entity-index loads and the intent
+    query shapes (parameterized or with the name inlined) from dicts.
+    Anything else returns no rows."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.schema = ""
+        self.structured_schema = {}
+        self.queries = 0
+        self.unsupported_queries = 0
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.people = {}
+        self.ids_by_name = {}
+        self.projects = set()
+        self.mentees = {"IS_CAREER_MENTOR_OF": {}, "IS_TECH_MENTOR_OF": {}}
+        self.mentors = {"IS_CAREER_MENTOR_OF": {}, "IS_TECH_MENTOR_OF": {}}
+        self.works_on = {}
+        self.members = {}
+        self.relationships = 0
+        self.relationship_types = set()
+
+    def refresh_schema(self):
+        if not self.people:
+            self.schema = ""
+            self.structured_schema = {}
+            return
+        stored = set().union(*(person.keys() for person in self.people.values()))
+        order = ["IS_CAREER_MENTOR_OF", "IS_CAREER_MENTEE_OF", "IS_TECH_MENTOR_OF",
+                 "IS_TECH_MENTEE_OF", "WORKS_ON"]
+        self.structured_schema = {
+            "node_props": {
+                "Person": [{"property": name, "type": "STRING"}
+                           for name in PERSON_PROPERTIES if name in stored],
+                "Project": [{"property": "name", "type": "STRING"}],
+            },
+            "rel_props": {},
+            "relationships": [
+                {"start": "Person", "type": rel_type,
+                 "end": "Project" if rel_type == "WORKS_ON" else "Person"}
+                for rel_type in order if rel_type in self.relationship_types],
+        }
+        self.schema = format_schema(**{
+            key: self.structured_schema[key]
+            for key in ("node_props", "rel_props", "relationships")})
+
+    def store_stats(self):
+        properties = sum(len(person) for person in self.people.values()) + len(self.projects)
+        property_records = sum(-(-len(person) // PROPERTIES_PER_RECORD)
+                               for person in self.people.values()) + len(self.projects)
+        return {
+            "nodes": self.node_count(),
+            "relationships": self.relationships,
+            "properties": properties,
+            "estimated_bytes": (self.node_count() * NODE_RECORD_BYTES
+                                + self.relationships * RELATIONSHIP_RECORD_BYTES
+                                + property_records * PROPERTY_RECORD_BYTES),
+        }
+
+    def node_count(self):
+        return len(self.people) + len(self.projects)
+
+    # Reads
+
+    def query(self, cypher: str, params: dict = {}):
+        if self.latency:
+            time.sleep(self.latency)
+        self.queries += 1
+        cypher, params = parameterize_name(cypher, params)
+
+        if cypher == PEOPLE_QUERY:
+            return [{"name": person["full_name"]} for person in self.people.values()]
+        if cypher == PROJECTS_QUERY:
+            return [{"name": name} for name in self.projects]
+        if cypher == ingest.ROW_HASHES_QUERY:
+            return [{"id": i, "row_hash": person.get("row_hash"), "full_name": person["full_name"]}
+                    for i, person in self.people.items()]
+        if cypher == snapshot.PEOPLE_QUERY:
+            return [{key: person[key] for key in ("id", "full_name", "position", "department")}
+                    for person in self.people.values()]
+        if cypher == snapshot.WORKS_ON_EDGES_QUERY:
+            return [{"id": i, "project": project}
+                    for i, projects in self.works_on.items() for project in projects]
+        for rel_type in self.mentees:
+            if cypher == snapshot.MENTOR_EDGES_QUERY.format(rel_type):
+                return [{"mentor_id": i, "id": j}
+                        for i, mentees in self.mentees[rel_type].items() for j in mentees]
+        for intent, (_, _, intent_cypher, _) in INTENTS.items():
+            if cypher == intent_cypher:
+                return [{"value": value} for value in self._intent(intent, params["name"])]
+        self.unsupported_queries += 1
+        return []
+
+    def _intent(self, intent: str, name: str):
+        if intent == "project_members":
+            return sorted(self.people[i]["full_name"] for i in self.members.get(name, ()))
+        ids = self.ids_by_name.get(name, ())
+        if intent in ("department", "id", "full_name", "position"):
+            return [self.people[i][intent] for i in ids]
+        if intent == "projects":
+            return sorted({project for i in ids for project in self.works_on.get(i, ())})
+        if intent == "reports":
+            mentees = self.mentees["IS_CAREER_MENTOR_OF"]
+            seen, stack = set(ids), list(ids)
+            while stack:
+                for j in mentees.get(stack.pop(), ()):
+                    if j not in seen:
+                        seen.add(j)
+                        stack.append(j)
+            return sorted({self.people[j]["full_name"] for j in seen - set(ids)})
+        rel_type = "IS_CAREER_MENTOR_OF" if intent.startswith("career") else "IS_TECH_MENTOR_OF"
+        edges = self.mentees if intent.endswith("mentees") else self.mentors
+        return sorted({self.people[j]["full_name"]
+                       for i in ids for j in edges[rel_type].get(i, ())})
+
+    # Writes
+
+    def write(self, query: str, params: dict = None):
+        if self.latency:
+            time.sleep(self.latency)
+        rows = (params or {}).get("rows", [])
+        nodes = relationships = 0
+        with self._lock:
+            if query in (ingest.PERSON_QUERY, ingest.COMPACT_PERSON_QUERY):
+                for row in rows:
+                    if row["id"] in self.people:
+                        self._unname(row["id"])
+                    else:
+                        nodes += 1
+                    self.people[row["id"]] = dict(row)
+                    self.ids_by_name.setdefault(row["full_name"], []).append(row["id"])
+            elif query == ingest.ROW_HASH_QUERY:
+                for row in rows:
+                    self.people[row["id"]]["row_hash"] = row["row_hash"]
+            elif query == ingest.DELETE_PERSONS_QUERY:
+                return self._delete_people(rows)
+            elif query == ingest.CLEAR_MENTOR_EDGES_QUERY:
+                return SimpleNamespace(nodes_deleted=0, relationships_deleted=sum(
+                    self._clear_mentors(person_id) for person_id in rows))
+            elif query == ingest.CLEAR_MENTEE_EDGES_QUERY:
+                # Reverse edges are implied by the mentor edges and were
+                # removed with them.
+                return SimpleNamespace(nodes_deleted=0, relationships_deleted=0)
+            elif query == ingest.CLEAR_WORKS_ON_QUERY:
+                return SimpleNamespace(nodes_deleted=0, relationships_deleted=sum(
+                    self._clear_works_on(person_id) for person_id in rows))
+            elif query == ingest.DELETE_ORPHAN_PROJECTS_QUERY:
+                orphans = {name for name in self.projects if not self.members.get(name)}
+                self.projects -= orphans
+                return SimpleNamespace(nodes_deleted=len(orphans), relationships_deleted=0)
+            elif query == ingest.PROJECT_QUERY:
+                nodes = len(set(rows) - self.projects)
+                self.projects.update(rows)
+            elif query in MENTOR_QUERIES:
+                rel_type, reverse_type = MENTOR_QUERIES[query]
+                self.relationship_types.update(t for t in (rel_type, reverse_type) if t)
+                for row in rows:
+                    self.mentees[rel_type].setdefault(row["mentor_id"], set()).add(row["id"])
+                    self.mentors[rel_type].setdefault(row["id"], set()).add(row["mentor_id"])
+                    relationships += 2 if reverse_type else 1
+            elif query == ingest.WORKS_ON_QUERY:
+                self.relationship_types.add("WORKS_ON")
+                for row in rows:
+                    self.works_on.setdefault(row["id"], set()).add(row["project"])
+                    self.members.setdefault(row["project"], set()).add(row["id"])
+                    relationships += 1
+            elif "DELETE" in query:
+                return self._delete(query, params["limit"])
+            self.relationships += relationships
+        return SimpleNamespace(nodes_created=nodes, relationships_created=relationships,
+                               nodes_deleted=0, relationships_deleted=0)
+
+    def _unname(self, person_id):
+        ids = self.ids_by_name.get(self.people[person_id]["full_name"], [])
+        if person_id in ids:
+            ids.remove(person_id)
+        if not ids:
+            self.ids_by_name.pop(self.people[person_id]["full_name"], None)
+
+    def _mentorship_edges(self, count):
+        # The full model stores every mentorship twice (mentor and mentee
+        # edges).
+        return count * 2 if "IS_CAREER_MENTEE_OF" in self.relationship_types else count
+
+    def _clear_mentors(self, person_id):
+        deleted = 0
+        for rel_type, mentors in self.mentors.items():
+            for mentor_id in mentors.pop(person_id, ()):
+                self.mentees[rel_type][mentor_id].discard(person_id)
+                deleted += 1
+        deleted = self._mentorship_edges(deleted)
+        self.relationships -= deleted
+        return deleted
+
+    def _clear_mentees(self, person_id):
+        deleted = 0
+        for rel_type, mentees in self.mentees.items():
+            for mentee_id in mentees.pop(person_id, ()):
+                self.mentors[rel_type][mentee_id].discard(person_id)
+                deleted += 1
+        deleted = self._mentorship_edges(deleted)
+        self.relationships -= deleted
+        return deleted
+
+    def _clear_works_on(self, person_id):
+        projects = self.works_on.pop(person_id, ())
+        for name in projects:
+            self.members[name].discard(person_id)
+        self.relationships -= len(projects)
+        return len(projects)
+
+    def _delete_people(self, ids):
+        nodes = relationships = 0
+        for person_id in ids:
+            if person_id not in self.people:
+                continue
+            relationships += (self._clear_mentors(person_id) + self._clear_mentees(person_id)
+                              + self._clear_works_on(person_id))
+            self._unname(person_id)
+            del self.people[person_id]
+            nodes += 1
+        return SimpleNamespace(nodes_deleted=nodes, relationships_deleted=relationships)
+
+    def _delete(self, query: str, limit: int):
+        # Deletion is simulated by counts only; the batch loop is what is
+        # being measured.
+        if "()-[r]->()" in query:
+            deleted = min(limit, self.relationships)
+            self.relationships -= deleted
+            return SimpleNamespace(nodes_deleted=0, relationships_deleted=deleted)
+        deleted = 0
+        for person_id in list(self.people)[:limit]:
+            self.ids_by_name.pop(self.people.pop(person_id)["full_name"], None)
+            deleted += 1
+        for name in list(self.projects)[:limit - deleted]:
+            self.projects.discard(name)
+            deleted += 1
+        if not self.node_count():
+            self.clear()
+        return SimpleNamespace(nodes_deleted=deleted, relationships_deleted=0)
+
+
+class InMemoryNeo4j(Neo4j):
+    """``Neo4j`` wrapper backed by ``InMemoryGraph`` instead of a driver."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        super().__init__(url="memory://", username="", password="",
+                         graphDB=InMemoryGraph(latency=latency))
+
+    def write(self, query: str, params: dict = None):
+        return self.graphDB.write(query, params)
+
+    def close(self):
+        pass
+
+
+class FakeLLM(LLM):
+    """Returns canned Cypher and answers after a fixed delay.
+
+    Cypher is produced by running the question through the intent router and
+    inlining the entity name, which is what a well-behaved model writes for
+    the canonical questions. Questions the router does not recognise get a
+    query the in-memory graph answers with no rows.
+    """
+
+    latency: float = 0.0
+    answer: str = "This is a canned answer."
+    index: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-bench"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager=None, **kwargs: Any) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        if "Generate Cypher query" not in prompt:
+            return self.answer
+        question = prompt.rsplit("<Question>", 1)[-1].split("</Question>", 1)[0].strip()
+        match = IntentRouter(self.index or EntityIndex()).match(question)
+        if match is None:
+            return "MATCH (p:Person {full_name: 'Nobody'}) RETURN p.full_name AS value"
+        return f"```{inline_name(match.cypher, match.entity)}```"
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        # Time to first token is the configured latency; the rest of the
+        # answer follows word by word.
+        text = self._call(prompt, stop, run_manager, **kwargs)
+        for index, word in enumerate(text.split(" ")):
+            chunk = GenerationChunk(text=word if index == 0 else " " + word)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
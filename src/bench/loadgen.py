@@ -0,0 +1,267 @@
+"""Replays a question corpus against a running API.
+
+    python -m src.bench.loadgen --url http://localhost:8888 --concurrency 16 --requests 1000
+    python -m src.bench.loadgen --rate 20 --duration 60 --model llama
+    python -m src.bench.loadgen --fake-server --concurrency 32
+
+The corpus is built from the names and projects in the HR CSV plus the
+frontend's example questions. ``--concurrency`` keeps that many requests
+in flight (closed loop); ``--rate`` sends Poisson arrivals at a fixed mean
+rate whether or not earlier requests finished (open loop), and measures
+latency from the scheduled send time so queueing in the client is
+counted. ``--fake-server`` starts the app in-process on the fake LLM and
+in-memory graph, so no network, LLM key or Neo4j is needed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import httpx
+
+from ..llm.examples import PREDEFINED_MESSAGES
+from ..llm.ingest import DEFAULT_DATA_PATH
+from ..llm.schemas import AnswerModeEnum, ModelEnum
+from .corpus import make_questions, summarize
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def build_corpus(path: str, count: int, seed: int):
+    questions = list(PREDEFINED_MESSAGES) + make_questions(
+        path, max(count - len(PREDEFINED_MESSAGES), 0), seed)
+    random.Random(seed).shuffle(questions)
+    return questions
+
+
+def histogram(latencies):
+    counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    for latency in latencies:
+        ms = latency * 1000
+        index = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if ms <= bound),
+                     len(HISTOGRAM_BUCKETS_MS))
+        counts[index] += 1
+    bounds = [str(bound) for bound in HISTOGRAM_BUCKETS_MS] + ["+Inf"]
+    return [{"le_ms": bound, "count": count} for bound, count in zip(bounds, counts)]
+
+
+def format_histogram(buckets, width: int = 50) -> str:
+    peak = max((bucket["count"] for bucket in buckets), default=0) or 1
+    return "\n".join(
+        f"<= {bucket['le_ms']:>6} ms {bucket['count']:>7} {'#' * round(bucket['count'] / peak * width)}"
+        for bucket in buckets)
+
+
+class LoadGenerator:
+    """Sends the corpus through one pooled ``httpx.AsyncClient`` and
+    records per-request latency and outcome."""
+
+    def __init__(self, url: str, questions, model: str = "openai", answer_mode: str = "auto",
+                 stream: bool = False, connections: int = 100, timeout: float = 60.0) -> None:
+        self.url = url.rstrip("/")
+        self.questions = questions
+        self.model = model
+        self.answer_mode = answer_mode
+        self.stream = stream
+        self.connections = connections
+        self.timeout = timeout
+        self.latencies = []
+        self.first_token = []
+        self.statuses = {}
+        self.errors = {}
+        self.stream_errors = 0
+
+    def params(self, index: int):
+        return {"question": self.questions[index % len(self.questions)],
+                "model": self.model, "answer_mode": self.answer_mode}
+
+    async def send(self, client, index: int, started: float):
+        status = None
+        try:
+            if self.stream:
+                status = await self._send_stream(client, index, started)
+            else:
+                response = await client.post("/generate_response", params=self.params(index))
+                status = response.status_code
+        except httpx.HTTPError as exc:
+            name = type(exc).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    async def _send_stream(self, client, index: int, started: float):
+        async with client.stream("POST", "/generate_response/stream",
+                                 params=self.params(index)) as response:
+            event = None
+            first_token = None
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    if event == "token" and first_token is None:
+                        first_token = time.perf_counter() - started
+                        self.first_token.append(first_token)
+                    elif event == "error":
+                        # The stream was accepted but the pipeline failed.
+                        self.stream_errors += 1
+            return response.status_code
+
+    def client(self):
+        limits = httpx.Limits(max_connections=self.connections,
+                              max_keepalive_connections=self.connections)
+        return httpx.AsyncClient(base_url=self.url, limits=limits,
+                                 timeout=httpx.Timeout(self.timeout))
+
+    async def closed_loop(self, concurrency: int, requests: int):
+        counter = iter(range(requests))
+
+        async def worker(client):
+            for index in counter:
+                await self.send(client, index, time.perf_counter())
+
+        async with self.client() as client:
+            await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+
+    async def open_loop(self, rate: float, duration: float, requests: int, seed: int):
+        rng = random.Random(seed)
+        tasks = []
+        async with self.client() as client:
+            started = time.perf_counter()
+            scheduled = started
+            index = 0
+            while index < requests and scheduled - started < duration:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(self.send(client, index, scheduled)))
+                index += 1
+                scheduled += rng.expovariate(rate)
+            await asyncio.gather(*tasks)
+
+    def report(self, elapsed: float):
+        completed = len(self.latencies)
+        failed = sum(self.errors.values()) + self.stream_errors + sum(
+            count for status, count in self.statuses.items() if status >= 400)
+        sent = completed + sum(self.errors.values())
+        report = dict(
+            summarize(self.latencies),
+            sent=sent,
+            seconds=elapsed,
+            requests_per_sec=completed / elapsed if elapsed else 0.0,
+            error_rate=failed / sent if sent else 0.0,
+            statuses={str(status): count for status, count in sorted(self.statuses.items())},
+            errors=dict(self.errors),
+            histogram=histogram(self.latencies))
+        if self.stream:
+            report["stream_errors"] = self.stream_errors
+            report["time_to_first_token"] = summarize(self.first_token)
+        return report
+
+
+def start_fake_server(args, path: str, port: int):
+    """Runs the app on the fake LLM and in-memory graph in a background
+    thread; returns the uvicorn server once it accepts connections."""
+    import uvicorn
+
+    from ..llm.intents import EntityIndex
+    from ..llm.service import Service
+    from ..main import create_app
+    from .fakes import FakeLLM, InMemoryNeo4j
+
+    def service_factory():
+        graph = InMemoryNeo4j(latency=args.graph_latency)
+        llm = FakeLLM(latency=args.llm_latency)
+        graph.populate_data_hr(path=path)
+        service = Service(graphDB_instance=graph, model_factory=lambda model: llm)
+        llm.index = EntityIndex.load(graph.get_graph())
+        return service
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(service_factory), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="fake-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"fake server failed to start on port {port}")
+        time.sleep(0.05)
+    return server, thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive load against the QA API.")
+    parser.add_argument("--url", default=os.getenv("API_URL", "http://localhost:8888"))
+    parser.add_argument("--data", default=os.getenv("HR_DATA_PATH") or DEFAULT_DATA_PATH,
+                        help="CSV whose names and projects fill the question corpus")
+    parser.add_argument("--corpus-size", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=500,
+                        help="requests to send (open loop: upper bound)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="requests in flight (closed loop)")
+    parser.add_argument("--rate", type=float,
+                        help="mean arrivals per second; switches to an open loop")
+    parser.add_argument("--duration", type=float, default=60.0,
+                        help="seconds to send for in the open loop")
+    parser.add_argument("--model", default=ModelEnum.openai.value,
+                        choices=[model.value for model in ModelEnum])
+    parser.add_argument("--answer-mode", default=AnswerModeEnum.auto.value,
+                        choices=[mode.value for mode in AnswerModeEnum])
+    parser.add_argument("--stream", action="store_true",
+                        help="use the SSE endpoint and report time to first token")
+    parser.add_argument("--connections", type=int, default=100,
+                        help="HTTP connection pool size")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fake-server", action="store_true",
+                        help="start the app locally on the fake LLM and in-memory graph")
+    parser.add_argument("--port", type=int, default=8899, help="port of the fake server")
+    parser.add_argument("--llm-latency", type=float, default=0.05,
+                        help="seconds per fake LLM call")
+    parser.add_argument("--graph-latency", type=float, default=0.002,
+                        help="seconds per fake graph round-trip")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.fake_server:
+        server, thread = start_fake_server(args, args.data, args.port)
+        args.url = f"http://127.0.0.1:{args.port}"
+
+    questions = build_corpus(args.data, args.corpus_size, args.seed)
+    generator = LoadGenerator(args.url, questions, model=args.model,
+                              answer_mode=args.answer_mode, stream=args.stream,
+                              connections=args.connections, timeout=args.timeout)
+    started = time.perf_counter()
+    try:
+        if args.rate:
+            asyncio.run(generator.open_loop(args.rate, args.duration, args.requests, args.seed))
+        else:
+            asyncio.run(generator.closed_loop(args.concurrency, args.requests))
+    finally:
+        elapsed = time.perf_counter() - started
+        if server is not None:
+            server.should_exit = True
+            thread.join()
+
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "mode": "open_loop" if args.rate else "closed_loop",
+        "corpus": len(questions),
+        "results": generator.report(elapsed),
+    }
+    sys.stderr.write(format_histogram(results["results"]["histogram"]) + "\n")
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Offline benchmarks for the QA pipeline, ingest and delete.
+
+    python -m src.bench.run --sizes 1000,10000 --output bench.json
+
+Everything runs against the stand-ins in ``src.bench.fakes`` so the
+numbers are repeatable; diff the JSON between commits to spot
+regressions.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from ..data.populate import OrgPlan, generate, project_departments
+from ..llm.compact import estimate_tokens
+from ..llm.ingest import GRAPH_MODELS, read_rows
+from ..llm.intents import EntityIndex
+from ..llm.metrics import RequestTrace
+from ..llm.schemas import Question
+from ..llm.service import Service
+from .corpus import make_questions, summarize
+from .fakes import FakeLLM, InMemoryNeo4j
+
+def generate_org(employees: int, directory: str, seed: int) -> str:
+    path = os.path.join(directory, f"org_{employees}.csv")
+    plan = OrgPlan(employees, {department: 1.0 for department in project_departments},
+                   6, 5, 30, seed)
+    generate(plan, path)
+    return path
+
+
+def make_service(args, path: str = None, graph_model: str = "full"):
+    graph = InMemoryNeo4j(latency=args.graph_latency)
+    llm = FakeLLM(latency=args.llm_latency)
+    service = Service(graphDB_instance=graph, model_factory=lambda model: llm)
+    service.graph_model = graph_model
+    if path:
+        graph.populate_data_hr(path=path, batch_size=args.batch_size, workers=args.workers,
+                               model=graph_model)
+        service.refresh_indexes()
+    llm.index = EntityIndex.load(graph.get_graph())
+    return service
+
+
+def bench_ingest_delete(args, path: str, employees: int, graph_model: str = "full"):
+    graph = InMemoryNeo4j(latency=args.graph_latency)
+    ingest = graph.populate_data_hr(path=path, batch_size=args.batch_size,
+                                    workers=args.workers, model=graph_model)["ingest"]
+    store = graph.get_graph().store_stats()
+    schema_tokens = estimate_tokens(graph.get_schema())
+    delete = graph.delete_data_hr(batch_size=args.batch_size)["delete"]
+    return {
+        "employees": employees,
+        "graph_model": graph_model,
+        "store": store,
+        "schema_tokens": schema_tokens,
+        "ingest": {key: ingest[key] for key in
+                   ("rows", "seconds", "rows_per_sec", "node_seconds", "relationship_seconds")},
+        "delete": dict(delete, deleted_per_sec=(
+            delete["nodes_deleted"] + delete["relationships_deleted"]) / delete["seconds"]
+            if delete["seconds"] else 0.0),
+    }
+
+
+def bench_delta_sync(args, path: str, employees: int, directory: str, changed: float = 0.01):
+    """A sync after ``changed`` of the rows moved department, applied as a
+    delta and as a full reload."""
+    rows = list(read_rows(path))
+    rng = random.Random(args.seed)
+    for row in rng.sample(rows, max(1, int(len(rows) * changed))):
+        row["department"] = row["department"] + " (moved)"
+    changed_path = os.path.join(directory, f"org-{employees}-changed.csv")
+    with open(changed_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    results = {"employees": employees, "changed_rows": max(1, int(len(rows) * changed))}
+    for mode in ("delta", "full"):
+        graph = InMemoryNeo4j(latency=args.graph_latency)
+        graph.sync_data_hr(path=path, batch_size=args.batch_size, workers=args.workers)
+        load = graph.sync_data_hr if mode == "delta" else graph.populate_data_hr
+        ingest = load(path=changed_path, batch_size=args.batch_size, workers=args.workers)["ingest"]
+        results[mode] = {key: ingest[key] for key in ("seconds", "touched") if key in ingest}
+    unchanged = InMemoryNeo4j(latency=args.graph_latency)
+    unchanged.sync_data_hr(path=path, batch_size=args.batch_size, workers=args.workers)
+    results["unchanged"] = {"seconds": unchanged.sync_data_hr(
+        path=path, batch_size=args.batch_size, workers=args.workers)["ingest"]["seconds"]}
+    return results
+
+
+def bench_entity_resolution(service: Service, questions):
+    """Misspelled questions with and without fuzzy name resolution: how
+    many come back empty and what resolution costs."""
+    results = {}
+    for fuzzy in (False, True):
+        service.fuzzy_entities = fuzzy
+        service.answer_cache.clear()
+        service.cypher_cache.clear()
+        empty = 0
+        stages = []
+        for text in questions:
+            trace = RequestTrace()
+            service.generate_response(Question(question=text, model="openai"), trace)
+            empty += not trace.rows
+            stages.append(trace.stages.get("entity_resolution", 0.0))
+        results["fuzzy" if fuzzy else "exact"] = {
+            "questions": len(questions),
+            "empty_results": empty,
+            "resolution": summarize(stages) if fuzzy else None,
+        }
+    results["entities"] = service.entity_resolver.stats()
+    return results
+
+
+def bench_single(service: Service, questions, intent_fast_path: bool, answer_mode: str = "auto"):
+    service.intent_fast_path = intent_fast_path
+    service.answer_cache.clear()
+    service.cypher_cache.clear()
+    latencies = []
+    paths = {}
+    for text in questions:
+        started = time.perf_counter()
+        response = service.generate_response(
+            Question(question=text, model="openai", answer_mode=answer_mode))
+        latencies.append(time.perf_counter() - started)
+        paths[response["path"]] = paths.get(response["path"], 0) + 1
+    return dict(summarize(latencies), paths=paths)
+
+
+async def _drive(app, questions, concurrency: int):
+    latencies = []
+    statuses = {}
+    queue = list(questions)
+
+    async def worker(client):
+        while queue:
+            text = queue.pop()
+            started = time.perf_counter()
+            response = await client.post(
+                "/generate_response",
+                params={"question": text, "model": "openai", "answer_mode": "llm"})
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+    return dict(summarize(latencies), concurrency=concurrency,
+                requests_per_sec=len(latencies) / elapsed if elapsed else 0.0,
+                statuses={str(code): count for code, count in statuses.items()})
+
+
+def bench_throughput(service: Service, questions, concurrency_levels):
+    from ..main import app
+
+    # ASGITransport does not run the lifespan, so install the stand-in
+    # service directly.
+    app.state.service = service
+
+    # One event loop for every level: the limiter's semaphore binds to the
+    # first loop that waits on it.
+    async def drive_levels():
+        results = []
+        for concurrency in concurrency_levels:
+            service.answer_cache.clear()
+            service.cypher_cache.clear()
+            results.append(await _drive(app, questions, concurrency))
+        return results
+
+    return asyncio.run(drive_levels())
+
+
+def bench_startup(runs: int = 3):
+    """Seconds to import the app in a fresh interpreter; what every worker
+    start and scale-out pays before it can serve."""
+    script = ("import time; started = time.perf_counter(); import src.main; "
+              "print(time.perf_counter() - started)")
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    seconds = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-W", "ignore", "-c", script], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+        seconds.append(float(output.strip().splitlines()[-1]))
+    return {"import_seconds": min(seconds), "runs": runs}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run offline benchmarks.")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="comma-separated employee counts for ingest/delete")
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,8,32",
+                        help="comma-separated concurrent client counts")
+    parser.add_argument("--llm-latency", type=float, default=0.05,
+                        help="seconds per fake LLM call")
+    parser.add_argument("--graph-latency", type=float, default=0.002,
+                        help="seconds per fake graph round-trip")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "started_at": time.time(),
+        "config": vars(args),
+        "startup": bench_startup(),
+        "ingest_delete": [],
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {size: generate_org(size, directory, args.seed) for size in sizes}
+        for size in sizes:
+            results["ingest_delete"].append(bench_ingest_delete(args, paths[size], size))
+        results["delta_sync"] = bench_delta_sync(args, paths[sizes[-1]], sizes[-1], directory)
+
+        path = paths[sizes[0]]
+        questions = make_questions(path, args.questions, args.seed)
+        service = make_service(args, path)
+        results["single_question"] = {
+            "llm": bench_single(service, questions, intent_fast_path=False, answer_mode="llm"),
+            "template": bench_single(service, questions, intent_fast_path=False),
+            "intent": bench_single(service, questions, intent_fast_path=True),
+        }
+        service.snapshot_enabled = True
+        service.refresh_indexes()
+        results["single_question"]["intent_snapshot"] = bench_single(
+            service, questions, intent_fast_path=True)
+        results["entity_resolution"] = bench_entity_resolution(
+            service, make_questions(path, args.questions, args.seed, typos=True))
+        service.fuzzy_entities = True
+        results["snapshot"] = service.snapshot.stats()
+        service.snapshot_enabled = False
+        service.snapshot = None
+        service.intent_fast_path = False
+
+        # The same questions through the full LLM chain on each graph model.
+        results["graph_models"] = {}
+        for graph_model in GRAPH_MODELS:
+            model_service = make_service(args, path, graph_model)
+            results["graph_models"][graph_model] = {
+                "ingest_delete": bench_ingest_delete(args, paths[sizes[-1]], sizes[-1], graph_model),
+                "single_question_llm": bench_single(
+                    model_service, questions, intent_fast_path=False, answer_mode="llm"),
+            }
+            model_service.close()
+
+        results["throughput"] = bench_throughput(
+            service, questions, [int(c) for c in args.concurrency.split(",")])
+        service.close()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
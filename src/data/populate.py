@@ -1,9 +1,23 @@
+"""Generates a synthetic org chart CSV for the HR graph.
+
+    python src/data/populate.py --employees 100000 --seed 42
+    python src/data/populate.py --employees 10000000 --workers 8 \
+        --output src/data/org_10m.csv.gz
+
+Output is identical for a given seed and set of options regardless of
+``--workers``: rows are produced in fixed-size chunks, each with its own
+RNG derived from the seed and chunk number, and written back in order.
+"""
+import argparse
+import bisect
 import csv
+import gzip
+import itertools
+import multiprocessing
 import random
-from faker import Faker
+import sys
 
-# Initialize the Faker generator
-faker = Faker()
+from faker.providers.person.en_US import Provider as PersonProvider
 
 # Define departments and positions
 departments = {
@@ -65,189 +79,316 @@ cross_department_projects = [
     "Product Quality Assurance Initiative"
 ]
 
+# Departments that staff projects by default (Finance and HR have none)
+project_departments = [
+    department for department, roles in departments.items() if "projects" not in roles]
+
+FIELDNAMES = ["id", "full_name", "position", "department",
+              "career_mentor", "tech_mentor", "project"]
+
 # Parameters for balancing
 EMPLOYEES_PER_LEAD = 6  # Each lead handles 6 employees
 LEADS_PER_HEAD = 5      # Each department head handles 5 leads
+ADDITIONAL_PROJECT_RATE = 0.2  # Share of leads/employees on a second project
+
+# Faker's weighted name tables, sampled directly: calling faker.name() per
+# row is far too slow for multi-million row orgs.
+FIRST_NAMES = list(PersonProvider.first_names)
+FIRST_NAME_WEIGHTS = list(itertools.accumulate(PersonProvider.first_names.values()))
+LAST_NAMES = list(PersonProvider.last_names)
+LAST_NAME_WEIGHTS = list(itertools.accumulate(PersonProvider.last_names.values()))
+
+
+def fake_name(rng: random.Random) -> str:
+    first = rng.choices(FIRST_NAMES, cum_weights=FIRST_NAME_WEIGHTS)[0]
+    last = rng.choices(LAST_NAMES, cum_weights=LAST_NAME_WEIGHTS)[0]
+    return f"{first} {last}"
+
+
+def project_names(count: int):
+    """The 30 named projects, then numbered waves of them for larger orgs."""
+    names = []
+    for wave in itertools.count(1):
+        for name in cross_department_projects:
+            if len(names) == count:
+                return names
+            names.append(name if wave == 1 else f"{name} {wave}")
+
+
+def split_headcount(total: int, mix: dict):
+    """Largest-remainder split of ``total`` across departments by weight."""
+    weight_sum = sum(mix.values())
+    exact = {department: total * weight / weight_sum for department, weight in mix.items()}
+    counts = {department: int(value) for department, value in exact.items()}
+    remainder = total - sum(counts.values())
+    for department in sorted(exact, key=lambda d: exact[d] - counts[d], reverse=True)[:remainder]:
+        counts[department] += 1
+    return counts
+
+
+class OrgPlan:
+    """Headcount layout shared by every chunk worker.
+
+    Ids follow the original generator: CEO 1, then employees, then leads,
+    then department heads. Each group is contiguous per department, so a
+    global index maps to its department with a bisect over ``*_bounds``.
+    """
+
+    def __init__(self, employees: int, mix: dict, employees_per_lead: int,
+                 leads_per_head: int, projects: int, seed: int) -> None:
+        self.seed = seed
+        self.projects = project_names(projects)
+        self.mix = mix
+        self.employee_counts = split_headcount(employees, mix)
+        self.lead_counts = {
+            department: max(1, count // employees_per_lead)
+            for department, count in self.employee_counts.items()}
+        self.head_counts = {
+            department: max(1, count // leads_per_head)
+            for department, count in self.lead_counts.items()}
+
+        self.department_order = list(mix)
+        self.employee_bounds = list(itertools.accumulate(
+            self.employee_counts[d] for d in self.department_order))
+        self.lead_bounds = list(itertools.accumulate(
+            self.lead_counts[d] for d in self.department_order))
+
+        self.total_employees = self.employee_bounds[-1]
+        self.total_leads = self.lead_bounds[-1]
+        self.first_employee_id = 2
+        self.first_lead_id = self.first_employee_id + self.total_employees
+        self.first_head_id = self.first_lead_id + self.total_leads
+
+        # Mentor indexes, filled in as heads and leads are generated.
+        self.heads_by_department = {department: [] for department in mix}
+        self.leads_by_department = {department: [] for department in mix}
+
+    def rng(self, *parts) -> random.Random:
+        return random.Random(":".join(str(part) for part in (self.seed,) + parts))
+
+    def department_at(self, bounds, index: int) -> str:
+        return self.department_order[bisect.bisect_right(bounds, index)]
+
+    def staffs_projects(self, department: str) -> bool:
+        return "projects" not in departments[department]
+
+
+def generate_ceo(plan: OrgPlan):
+    return {
+        "id": 1,
+        "full_name": fake_name(plan.rng("ceo")),
+        "position": "CEO",
+        "department": "",
+        "career_mentor": "",
+        "tech_mentor": "",
+        "project": None
+    }
 
-# Create a CEO
-CEO = {
-    "id": 1,
-    "full_name": faker.name(),
-    "position": "CEO",
-    "career_mentor": "",
-    "tech_mentor": "",
-    "project": None
-}
 
-# Generate 300 employees and distribute by department
-total_employees = 300
-employees = []
-employee_id = 2
-
-# Assign employees to departments
-for department, roles in departments.items():
-    # Skip HR and Finance for employee generation
-    if department in ["Finance", "Human Resources"]:
-        continue
-
-    # Equal number of employees per relevant department
-    dept_employee_count = total_employees // (len(departments) - 2)
-
-    for _ in range(dept_employee_count):
-        full_name = faker.name()
-        position = random.choice(roles["employees"])
-        employees.append({
-            "id": employee_id,
-            "full_name": full_name,
-            "position": position,
-            "department": department,
-            "career_mentor": "",
-            "tech_mentor": "",
-            "project": []  # List for multiple project assignments
-        })
-        employee_id += 1
-
-# Calculate number of leads needed per department based on EMPLOYEES_PER_LEAD
-leads = []
-lead_id = employee_id
-
-for department, roles in departments.items():
-    # Skip HR and Finance for lead generation
-    if department in ["Finance", "Human Resources"]:
-        continue
-
-    department_employees = [
-        e for e in employees if e["department"] == department]
-    num_leads = max(1, len(department_employees) // EMPLOYEES_PER_LEAD)
-
-    for _ in range(num_leads):
-        full_name = faker.name()
-        position = random.choice(roles["leads"])
-        leads.append({
-            "id": lead_id,
-            "full_name": full_name,
-            "position": position,
-            "department": department,
-            "career_mentor": "",
-            "tech_mentor": "",
-            "project": []  # List for multiple project assignments
-        })
-        lead_id += 1
-
-# Calculate number of department heads needed per department based on LEADS_PER_HEAD
-department_heads = []
-head_id = lead_id
-
-for department, roles in departments.items():
-    # Skip HR and Finance for head generation
-    if department in ["Finance", "Human Resources"]:
-        continue
-
-    department_leads = [
-        lead for lead in leads if lead["department"] == department]
-    num_heads = max(1, len(department_leads) // LEADS_PER_HEAD)
-
-    for _ in range(num_heads):
-        full_name = faker.name()
-        department_heads.append({
-            "id": head_id,
-            "full_name": full_name,
-            "position": f"Department Head",
+def generate_heads(plan: OrgPlan, ceo: dict):
+    head_id = plan.first_head_id
+    heads = []
+    for department in plan.department_order:
+        rng = plan.rng("heads", department)
+        department_heads = []
+        for _ in range(plan.head_counts[department]):
+            department_heads.append({
+                "id": head_id,
+                "full_name": fake_name(rng),
+                "position": "Department Head",
+                "department": department,
+                # All department heads report to the CEO
+                "career_mentor": ceo["full_name"],
+                "tech_mentor": ceo["full_name"],
+                "project": []
+            })
+            head_id += 1
+
+        # Round-robin the department's share of projects across its heads
+        if plan.staffs_projects(department):
+            department_projects = plan.projects.copy()
+            rng.shuffle(department_projects)
+            for i, project in enumerate(department_projects):
+                department_heads[i % len(department_heads)]["project"].append(project)
+
+        plan.heads_by_department[department] = [
+            head["full_name"] for head in department_heads]
+        heads.extend(department_heads)
+    return heads
+
+
+def assign_projects(plan: OrgPlan, rng: random.Random, department: str):
+    if not plan.staffs_projects(department):
+        return []
+    projects = [rng.choice(plan.projects)]
+    if rng.random() < ADDITIONAL_PROJECT_RATE:
+        extra_project = rng.choice(plan.projects)
+        if extra_project not in projects:
+            projects.append(extra_project)
+    return projects
+
+
+# Set in each worker process (and in the parent for serial runs).
+_plan = None
+
+
+def _init_worker(plan: OrgPlan):
+    global _plan
+    _plan = plan
+
+
+def generate_chunk(task):
+    """Generates rows ``start``..``end`` of ``kind`` ("lead" or "employee")."""
+    kind, chunk_index, start, end = task
+    plan = _plan
+    rng = plan.rng(kind, chunk_index)
+    if kind == "lead":
+        bounds, first_id = plan.lead_bounds, plan.first_lead_id
+        mentors = plan.heads_by_department
+    else:
+        bounds, first_id = plan.employee_bounds, plan.first_employee_id
+        mentors = plan.leads_by_department
+
+    rows = []
+    for index in range(start, end):
+        department = plan.department_at(bounds, index)
+        roles = departments[department]["leads" if kind == "lead" else "employees"]
+        # Leads are mentored by department heads, employees by leads
+        possible_mentors = mentors[department]
+        rows.append({
+            "id": first_id + index,
+            "full_name": fake_name(rng),
+            "position": rng.choice(roles),
             "department": department,
-            # All department heads report to the CEO
-            "career_mentor": CEO["full_name"],
-            "tech_mentor": CEO["full_name"],
-            "project": []  # List for multiple project assignments
+            "career_mentor": rng.choice(possible_mentors) if possible_mentors else "",
+            "tech_mentor": rng.choice(possible_mentors) if possible_mentors else "",
+            "project": assign_projects(plan, rng, department)
         })
-        head_id += 1
-
-# Function to distribute projects evenly among department heads
-
-
-def distribute_projects_among_heads(projects, heads):
-    random.shuffle(projects)  # Shuffle projects to make it random
-    for i, project in enumerate(projects):
-        head = heads[i % len(heads)]  # Round-robin distribution of projects
-        head["project"].append(project)
-
-# Function to assign projects randomly to leads and employees
-
-
-def assign_projects_randomly(projects, leads, employees):
-    all_assignees = leads + employees
-    random.shuffle(all_assignees)  # Shuffle to randomize assignment
-
-    # Assign each project equally across assignees, but in random order
-    for i, assignee in enumerate(all_assignees):
-        project = projects[i % len(projects)]
-        assignee["project"].append(project)
-
-# Assign additional projects to some leads and employees (e.g., 20% of them)
-
-
-def assign_additional_projects(projects, assignees, percentage=0.2):
-    num_additional_assignees = int(len(assignees) * percentage)
-    selected_assignees = random.sample(assignees, num_additional_assignees)
-
-    for assignee in selected_assignees:
-        extra_project = random.choice(projects)
-        if extra_project not in assignee["project"]:
-            assignee["project"].append(extra_project)
-
-
-# Distribute projects evenly among department heads
-for department, roles in departments.items():
-    if department in ["Finance", "Human Resources"]:
-        continue
-
-    department_projects = cross_department_projects.copy()
-    department_heads_in_dept = [
-        head for head in department_heads if head["department"] == department]
-
-    if department_heads_in_dept:
-        distribute_projects_among_heads(
-            department_projects, department_heads_in_dept)
-
-# Randomly assign projects to leads and employees
-assign_projects_randomly(cross_department_projects, leads, employees)
-
-# Assign additional projects to some leads and employees
-assign_additional_projects(cross_department_projects,
-                           leads + employees, percentage=0.2)
-
-# Function to find a mentor in the same department
-
-
-def find_department_mentor(employee, mentor_type="career"):
-    if employee["position"] in departments[employee["department"]]["employees"]:
-        # Regular employees are mentored by leads in the same department
-        possible_mentors = [
-            lead for lead in leads if lead["department"] == employee["department"]]
-    else:
-        # Leads are mentored by department heads
-        possible_mentors = [
-            head for head in department_heads if head["department"] == employee["department"]]
-
-    return random.choice(possible_mentors) if possible_mentors else None
-
-
-# Assign career and tech mentors to regular employees and leads
-for employee in employees + leads:
-    career_mentor = find_department_mentor(employee, "career")
-    tech_mentor = find_department_mentor(employee, "tech")
-
-    if career_mentor:
-        employee["career_mentor"] = career_mentor["full_name"]
-    if tech_mentor:
-        employee["tech_mentor"] = tech_mentor["full_name"]
-
-# Writing to CSV file
-all_employees = [CEO] + department_heads + leads + employees
-
-with open("src/data/employees_with_multiple_projects.csv", mode='w', newline='') as file:
-    writer = csv.DictWriter(file, fieldnames=[
-                            "id", "full_name", "position", "department", "career_mentor", "tech_mentor", "project"])
-    writer.writeheader()
-    writer.writerows(all_employees)
-
-print("CSV file generated as employees_with_multiple_projects.csv")
+    return rows
+
+
+def chunk_tasks(kind: str, total: int, chunk_size: int):
+    for chunk_index, start in enumerate(range(0, total, chunk_size)):
+        yield kind, chunk_index, start, min(start + chunk_size, total)
+
+
+class CsvWriter:
+    def __init__(self, path: str) -> None:
+        if path.endswith(".gz"):
+            self.file = gzip.open(path, mode="wt", newline="", encoding="utf-8")
+        else:
+            self.file = open(path, mode="w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDNAMES)
+        self.writer.writeheader()
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    def __init__(self, path: str) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.schema = pa.schema([(name, pa.string()) for name in FIELDNAMES])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write_rows(self, rows):
+        # Same textual encoding as the CSV so the ingest parser applies.
+        columns = {name: [None if row.get(name) is None else str(row[name]) for row in rows]
+                   for name in FIELDNAMES}
+        self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(path: str):
+    if path.endswith(".parquet"):
+        return ParquetWriter(path)
+    return CsvWriter(path)
+
+
+def parse_mix(value: str):
+    mix = {}
+    for part in value.split(","):
+        department, _, weight = part.partition("=")
+        department = department.strip()
+        if department not in departments:
+            raise argparse.ArgumentTypeError(
+                f"unknown department {department!r}; choose from {', '.join(departments)}")
+        mix[department] = float(weight) if weight else 1.0
+    return mix
+
+
+def generate(plan: OrgPlan, output: str, chunk_size: int = 50000, workers: int = 1):
+    writer = open_writer(output)
+    written = 0
+    try:
+        ceo = generate_ceo(plan)
+        heads = generate_heads(plan, ceo)
+        writer.write_rows([ceo] + heads)
+        written += 1 + len(heads)
+
+        _init_worker(plan)
+        # Leads must be written (and indexed as mentors) before employees;
+        # worker pools are created per phase so each sees the current plan.
+        for kind, total in (("lead", plan.total_leads), ("employee", plan.total_employees)):
+            tasks = chunk_tasks(kind, total, chunk_size)
+            if workers > 1:
+                with multiprocessing.Pool(workers, initializer=_init_worker,
+                                          initargs=(plan,)) as pool:
+                    written += _write_chunks(
+                        plan, writer, kind, pool.imap(generate_chunk, tasks))
+            else:
+                written += _write_chunks(plan, writer, kind, map(generate_chunk, tasks))
+    finally:
+        writer.close()
+    return written
+
+
+def _write_chunks(plan: OrgPlan, writer, kind: str, chunks):
+    written = 0
+    for rows in chunks:
+        writer.write_rows(rows)
+        written += len(rows)
+        if kind == "lead":
+            for row in rows:
+                plan.leads_by_department[row["department"]].append(row["full_name"])
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic org chart CSV.")
+    parser.add_argument("--employees", type=int, default=300,
+                        help="number of individual contributors (default 300)")
+    parser.add_argument("--departments", type=parse_mix,
+                        default={department: 1.0 for department in project_departments},
+                        help='department weights, e.g. "Engineering=3,Product=1,Finance=1"')
+    parser.add_argument("--employees-per-lead", type=int, default=EMPLOYEES_PER_LEAD)
+    parser.add_argument("--leads-per-head", type=int, default=LEADS_PER_HEAD)
+    parser.add_argument("--projects", type=int, default=len(cross_department_projects))
+    parser.add_argument("--seed", type=int, default=None,
+                        help="RNG seed; a random one is chosen and printed if omitted")
+    parser.add_argument("--output", default="src/data/employees_with_multiple_projects.csv",
+                        help="output path; .csv, .csv.gz or .parquet")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="generator processes; output does not depend on this")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    plan = OrgPlan(args.employees, args.departments, args.employees_per_lead,
+                   args.leads_per_head, args.projects, seed)
+    written = generate(plan, args.output, args.chunk_size, args.workers)
+    print(f"{written} rows generated as {args.output} (seed {seed})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
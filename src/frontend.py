@@ -1,37 +1,51 @@
 import json
+import os
 import gradio as gr
 import requests
 
+from llm.examples import PREDEFINED_MESSAGES
 from llm.schemas import Question, ModelEnum
 
+API_URL = os.getenv("API_URL", "http://localhost:8888")
+
 
 def send_request(question: str):
-    url = "http://localhost:8888/generate_response"
+    url = f"{API_URL}/generate_response/stream"
     payload = Question(question=question,
                        model=ModelEnum.openai).model_dump()
 
     try:
-        response = requests.post(url, params=payload)
-        if response.status_code == 200:
-            response_json = response.json().get('response', 'No answer found.')
-            return ' '.join(json.dumps(response_json, indent=4).replace('"', '').replace("\\n", " ").strip().split())
-        else:
-            return f"Error: {response.status_code}"
+        with requests.post(url, params=payload, stream=True) as response:
+            if response.status_code != 200:
+                yield f"Error: {response.status_code}"
+                return
+
+            # Server-Sent Events: "event: <name>" and "data: <json>" lines,
+            # separated by a blank line.
+            answer = ""
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):])
+                    if event == "token":
+                        answer += data["text"]
+                        yield ' '.join(answer.replace("\n", " ").split())
+                    elif event == "error":
+                        yield f"Error: {data['detail']}"
+                        return
+            if not answer:
+                yield "No answer found."
     except Exception as e:
-        return f"Failed to connect: {e}"
-
+        yield f"Failed to connect: {e}"
 
-predefined_messages = [
-    "Who is Rebecca Carroll's tech mentor?",
-    "Who are the tech mentee of Rebecca Carroll?",
-    "Who are part of project Compliance Management System?"
-]
 
 iface = gr.Interface(
     fn=send_request,
     inputs=gr.Textbox(label="Your Question", placeholder="Ask a question..."),
     outputs=gr.Textbox(label="Response"),
-    examples=predefined_messages,
+    examples=PREDEFINED_MESSAGES,
     title="Chatbox"
 )
 
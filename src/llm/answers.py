@@ -0,0 +1,200 @@
+import re
+import threading
+
+from .compact import NAME_PROPERTIES, flatten, property_name, requested_properties
+from .ingest import parse_projects
+from .intents import COUNT_OR_YES_NO_PATTERN, INTENTS, NO_ANSWER, join_names, unique
+
+STRING = r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"|\$(\w+)"
+NODE = r"\(\s*(\w*)\s*(?::\s*\w+)?\s*(\{[^}]*\})?\s*\)"
+RELATIONSHIP = r"(<?)-\[\s*\w*\s*:\s*(\w+)[^\]]*\]-(>?)"
+PATH_PATTERN = re.compile(NODE + r"\s*" + RELATIONSHIP + r"\s*" + NODE)
+RELATIONSHIP_PATTERN = re.compile(RELATIONSHIP)
+NODE_PATTERN = re.compile(NODE)
+PROPERTY_PATTERN = re.compile(r"(\w+)\s*:\s*(?:" + STRING + ")")
+WHERE_PATTERN = re.compile(r"\b(\w+)\.(\w+)\s*=\s*(?:" + STRING + ")")
+# Aggregates, extra predicates and variable-length paths change what the
+# rows mean.
+UNSUPPORTED_PATTERN = re.compile(
+    r"\b(?:count|sum|avg|min|max|size|length)\s*\(|\b(?:CONTAINS|STARTS WITH|ENDS WITH|OR|NOT)\b"
+    r"|<>|[<>]=?\s*[\d'\"$]|\[[^\]]*\*", re.IGNORECASE)
+
+ANCHOR_PROPERTIES = NAME_PROPERTIES | {"career_mentor", "tech_mentor"}
+
+# relationship -> (intent when the anchor is the source, intent when it is
+# the target)
+RELATIONSHIP_INTENTS = {
+    "IS_CAREER_MENTOR_OF": ("career_mentees", "career_mentor"),
+    "IS_CAREER_MENTEE_OF": ("career_mentor", "career_mentees"),
+    "IS_TECH_MENTOR_OF": ("tech_mentees", "tech_mentor"),
+    "IS_TECH_MENTEE_OF": ("tech_mentor", "tech_mentees"),
+    "WORKS_ON": ("projects", "project_members"),
+}
+
+# Person property -> intent whose answer template fits a lookup of it.
+PROPERTY_INTENTS = {
+    "department": "department",
+    "id": "id",
+    "position": "position",
+    "career_mentor": "career_mentor",
+    "tech_mentor": "tech_mentor",
+    "project": "projects",
+}
+
+
+def _unescape(match, offset):
+    single, double, param = match.group(offset, offset + 1, offset + 2)
+    if param is not None:
+        return None, param
+    value = single if single is not None else double
+    return value.replace("\\'", "'").replace('\\"', '"').replace("\\\\", "\\"), None
+
+
+def find_constraints(cypher: str, params: dict):
+    """Returns (variable, property, value) for every equality on a node,
+    inline (``{full_name: 'X'}``) or in ``WHERE v.p = 'X'``."""
+    constraints = []
+    for node in NODE_PATTERN.finditer(cypher):
+        for prop in PROPERTY_PATTERN.finditer(node.group(2) or ""):
+            value, param = _unescape(prop, 2)
+            constraints.append((node.group(1), prop.group(1),
+                                params.get(param) if param else value))
+    for where in WHERE_PATTERN.finditer(cypher):
+        value, param = _unescape(where, 3)
+        constraints.append((where.group(1), where.group(2),
+                            params.get(param) if param else value))
+    return constraints
+
+
+def column_values(rows, column):
+    values = []
+    for row in rows:
+        value = row.get(column)
+        if isinstance(value, (list, tuple)):
+            values.extend(str(item) for item in value)
+        elif isinstance(value, str) and value.startswith("[") and value.endswith("]"):
+            values.extend(parse_projects(value))
+        elif value is not None:
+            values.append(str(value))
+    return unique(values)
+
+
+def pick_column(columns, variable, properties):
+    candidates = [column for column in columns
+                  if column.startswith(variable + ".") and property_name(column) in properties]
+    if not candidates:
+        candidates = [column for column in columns
+                      if "." not in column and column in properties]
+    if not candidates and len(columns) == 1:
+        candidates = list(columns)
+    return candidates[0] if len(candidates) == 1 else None
+
+
+class AnswerRenderer:
+    """Writes the answer for common result shapes without the QA LLM.
+
+    The executed Cypher is classified by its single relationship (or
+    property lookup) and the node pinned to a name, and the rows are
+    rendered with the same sentence templates as the intent fast path.
+    Only a single column or a name list is rendered; other columns, counts,
+    yes/no questions and shapes it cannot classify return None and go to
+    the QA LLM.
+    """
+
+    def __init__(self) -> None:
+        self.rendered = {}
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def classify(self, question: str, cypher: str, params: dict, columns):
+        """Returns (intent, entity, value column) or None."""
+        if COUNT_OR_YES_NO_PATTERN.search(question) or UNSUPPORTED_PATTERN.search(cypher):
+            return None
+        constraints = find_constraints(cypher, params or {})
+        relationships = RELATIONSHIP_PATTERN.findall(cypher)
+        if len(relationships) > 1 or len(constraints) != 1:
+            return None
+        (variable, prop, entity), = constraints
+        if prop not in ANCHOR_PROPERTIES or entity is None:
+            return None
+
+        paths = PATH_PATTERN.findall(cypher)
+        if not relationships:
+            if prop in ("career_mentor", "tech_mentor"):
+                # MATCH (p) WHERE p.tech_mentor = 'X' RETURN p.full_name
+                intent = prop.split("_")[0] + "_mentees"
+                return intent, entity, pick_column(columns, variable, NAME_PROPERTIES)
+            requested = [name for name in requested_properties(question)
+                         if name in PROPERTY_INTENTS]
+            if len(requested) != 1:
+                return None
+            return (PROPERTY_INTENTS[requested[0]], entity,
+                    pick_column(columns, variable, {requested[0]}))
+
+        if len(paths) != 1:
+            return None
+        left, _, left_arrow, rel_type, right_arrow, right, _ = paths[0]
+        if rel_type not in RELATIONSHIP_INTENTS or prop not in NAME_PROPERTIES:
+            return None
+        if left_arrow and not right_arrow:
+            source, target = right, left
+        elif right_arrow and not left_arrow:
+            source, target = left, right
+        else:
+            return None
+        if variable == source:
+            intent, other = RELATIONSHIP_INTENTS[rel_type][0], target
+        elif variable == target:
+            intent, other = RELATIONSHIP_INTENTS[rel_type][1], source
+        else:
+            return None
+        if not other:
+            return None
+        return intent, entity, pick_column(columns, other, NAME_PROPERTIES)
+
+    def render(self, question: str, cypher: str, rows, params: dict = None):
+        """Returns the answer text, or None when the QA LLM is needed."""
+        if not cypher or not rows:
+            return self._count("empty", NO_ANSWER)
+
+        flat = [dict(flatten(row)) for row in rows]
+        columns = list(dict.fromkeys(column for row in flat for column in row))
+        shape = self.classify(question, cypher, params, columns)
+        if shape is None or shape[2] is None:
+            return self._fallback()
+
+        intent, entity, column = shape
+        if any(other != column and property_name(other) not in NAME_PROPERTIES
+               for other in columns):
+            # Other properties were asked for; the templates would drop them.
+            return self._fallback()
+        values = [value for value in column_values(flat, column) if value != entity]
+        if not values:
+            return self._fallback()
+        return self._count(intent, INTENTS[intent][3](entity, values))
+
+    def render_any(self, question: str, cypher: str, rows, params: dict = None):
+        """Like ``render`` but never defers to the LLM: unclassified results
+        are listed as they are."""
+        answer = self.render(question, cypher, rows, params)
+        if answer is not None:
+            return answer
+        flat = [dict(flatten(row)) for row in rows]
+        return join_names(unique(
+            ", ".join(str(value) for value in row.values()) for row in flat))
+
+    def _fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+        return None
+
+    def _count(self, shape: str, answer: str):
+        with self._lock:
+            self.rendered[shape] = self.rendered.get(shape, 0) + 1
+        return answer
+
+    def stats(self):
+        with self._lock:
+            return {"rendered": dict(self.rendered),
+                    "rendered_total": sum(self.rendered.values()),
+                    "fallbacks": self.fallbacks}
@@ -0,0 +1,74 @@
+import asyncio
+
+from .cache import normalize_question
+from .exceptions import QueueFullError, QueueTimeoutError
+from .metrics import RequestTrace
+
+
+def dedupe(questions):
+    """Groups batch positions by (normalized question, model, answer mode)."""
+    groups = {}
+    for index, question in enumerate(questions):
+        key = (normalize_question(question.question), question.model, question.answer_mode)
+        groups.setdefault(key, (question, []))[1].append(index)
+    return list(groups.values())
+
+
+def error_status(error: Exception) -> int:
+    if isinstance(error, QueueFullError):
+        return 429
+    if isinstance(error, QueueTimeoutError):
+        return 503
+    return 500
+
+
+async def _answer(service, question, semaphore):
+    async with semaphore:
+        trace = RequestTrace()
+        try:
+            response = await service.limiter.run(service.generate_response, question, trace)
+        except Exception as e:
+            return {"error": str(e) or type(e).__name__, "status": error_status(e)}
+        item = {"response": response["result"], "path": response["path"], "status": 200}
+        if question.timings:
+            item["timings"] = trace.as_dict()
+        return item
+
+
+def _items(questions, indices, result):
+    return [dict(result, index=index, question=questions[index].question) for index in indices]
+
+
+async def answer_batch(service, questions, concurrency: int):
+    """Answers every question, running at most ``concurrency`` unique
+    questions at once, and returns results in request order. A failure is
+    reported on its own items instead of failing the batch."""
+    semaphore = asyncio.Semaphore(concurrency)
+    groups = dedupe(questions)
+    results = await asyncio.gather(
+        *[_answer(service, question, semaphore) for question, _ in groups])
+
+    items = [None] * len(questions)
+    for (question, indices), result in zip(groups, results):
+        for item in _items(questions, indices, result):
+            items[item["index"]] = item
+    return items
+
+
+async def stream_batch(service, questions, concurrency: int):
+    """Like ``answer_batch`` but yields items as soon as they finish."""
+    semaphore = asyncio.Semaphore(concurrency)
+    groups = dedupe(questions)
+
+    async def run(question, indices):
+        return question, indices, await _answer(service, question, semaphore)
+
+    tasks = [asyncio.ensure_future(run(question, indices)) for question, indices in groups]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            question, indices, result = await next_done
+            for item in _items(questions, indices, result):
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
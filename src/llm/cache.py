@@ -0,0 +1,209 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_question(text: str) -> str:
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip("?!. ")
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with an optional TTL in seconds."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, created: float) -> bool:
+        return bool(self.ttl) and time.time() - created > self.ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(entry[1]):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, created: float = None):
+        with self._lock:
+            self._data[key] = (value, created or time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CypherCache(LRUCache):
+    """Generated Cypher keyed on normalized question, model and schema hash.
+
+    Because the schema hash is part of the key, entries generated against an
+    older schema are never returned once the schema changes. When ``path`` is
+    set, entries are written through to sqlite so a restarted worker starts
+    warm.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = None, path: str = None) -> None:
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.path = path
+        self.disk_hits = 0
+        self._db = None
+        self._db_lock = threading.Lock()
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cypher_cache "
+                "(key TEXT PRIMARY KEY, cypher TEXT NOT NULL, created REAL NOT NULL)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(question: str, model: str, schema_hash: str) -> str:
+        raw = f"{model}\x00{schema_hash}\x00{normalize_question(question)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        value = super().get(key)
+        if value is not None or self._db is None:
+            return value
+
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT cypher, created FROM cypher_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or self._expired(row[1]):
+            return None
+
+        # Promote to memory; the miss recorded above is reclassified as a hit.
+        super().set(key, row[0], created=row[1])
+        with self._lock:
+            self.misses -= 1
+            self.hits += 1
+            self.disk_hits += 1
+        return row[0]
+
+    def set(self, key, value, created: float = None):
+        created = created or time.time()
+        super().set(key, value, created=created)
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cypher_cache (key, cypher, created) VALUES (?, ?, ?)",
+                (key, value, created))
+            if self.ttl:
+                self._db.execute(
+                    "DELETE FROM cypher_cache WHERE created < ?", (created - self.ttl,))
+            self._db.commit()
+
+    def clear(self):
+        super().clear()
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute("DELETE FROM cypher_cache")
+            self._db.commit()
+
+    def entries(self):
+        """All cached Cypher, in memory and on disk."""
+        with self._lock:
+            values = {value for value, _ in self._data.values()}
+        if self._db is not None:
+            with self._db_lock:
+                values.update(row[0] for row in self._db.execute(
+                    "SELECT cypher FROM cypher_cache"))
+        return sorted(values)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+
+    def stats(self):
+        stats = super().stats()
+        stats["disk_path"] = self.path
+        stats["disk_hits"] = self.disk_hits
+        return stats
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for and share its result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.event.set()
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,161 @@
+import math
+import re
+import threading
+from collections import Counter
+
+from .ingest import parse_projects
+
+EMPTY_CONTEXT = "[]"
+
+# Person/Project properties and the question words that make them relevant.
+# Name columns are always kept; columns that are not a known property (e.g.
+# aliased aggregates) are kept as well.
+NAME_PROPERTIES = {"full_name", "name"}
+PROPERTY_KEYWORDS = {
+    "id": (r"\bids?\b", r"\bidentifier"),
+    "position": (r"\bposition", r"\brole", r"\btitle", r"\bjob"),
+    "department": (r"\bdepartment", r"\bdept", r"\bteam"),
+    "career_mentor": (r"\bcareer mentor",),
+    "tech_mentor": (r"\btech(nical)? mentor",),
+    "project": (r"\bproject", r"\bwork(s|ed|ing)? on\b"),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text and identifiers;
+    # good enough to enforce a budget and compare before/after sizes.
+    return math.ceil(len(text) / 4)
+
+
+def requested_properties(question: str):
+    question = question.lower()
+    return {name for name, patterns in PROPERTY_KEYWORDS.items()
+            if any(re.search(pattern, question) for pattern in patterns)}
+
+
+def flatten(row: dict, prefix: str = ""):
+    # Nodes come back as property dicts; expand them to "alias.property".
+    for key, value in row.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        else:
+            yield prefix + key, value
+
+
+def format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "; ".join(format_value(item) for item in value)
+    if isinstance(value, dict):
+        return ", ".join(f"{key}={format_value(item)}" for key, item in value.items())
+    value = str(value)
+    if value.startswith("[") and value.endswith("]"):
+        # The project property is stored as a stringified Python list.
+        return "; ".join(parse_projects(value))
+    return value
+
+
+def property_name(column: str) -> str:
+    return column.rsplit(".", 1)[-1]
+
+
+class ContextCompactor:
+    """Turns Cypher results into a compact table for the QA prompt.
+
+    Columns the question does not ask about are dropped, duplicate rows are
+    removed, values shared by every row are written once, and rows are added
+    until ``token_budget`` is reached; the rest is summarised.
+    """
+
+    def __init__(self, token_budget: int = 1000) -> None:
+        self.token_budget = token_budget
+        self.requests = 0
+        self.raw_tokens = 0
+        self.compact_tokens = 0
+        self._lock = threading.Lock()
+
+    def select_columns(self, question: str, columns):
+        requested = requested_properties(question)
+        known = NAME_PROPERTIES | set(PROPERTY_KEYWORDS)
+        selected = [column for column in columns
+                    if property_name(column) in NAME_PROPERTIES | requested
+                    or property_name(column) not in known]
+        return selected or list(columns)
+
+    def summary(self, columns, omitted):
+        lines = [f"... {len(omitted)} more rows not shown."]
+        for index, column in enumerate(columns):
+            counts = Counter(row[index] for row in omitted)
+            if len(counts) < len(omitted):
+                top = ", ".join(f"{value or '(none)'} ({count})"
+                                for value, count in counts.most_common(5))
+                lines.append(f"{column} among them: {top}")
+        return lines
+
+    def render(self, question: str, rows):
+        if not rows:
+            return EMPTY_CONTEXT, {"rows": 0, "rows_kept": 0, "columns": [],
+                                   "columns_dropped": []}
+
+        flat = [dict(flatten(row)) for row in rows]
+        columns = list(dict.fromkeys(column for row in flat for column in row))
+        selected = self.select_columns(question, columns)
+
+        unique_rows = list(dict.fromkeys(
+            tuple(format_value(row.get(column)) for column in selected) for row in flat))
+
+        lines = []
+        table_columns = selected
+        if len(unique_rows) > 1:
+            constant = [index for index, column in enumerate(selected)
+                        if len({row[index] for row in unique_rows}) == 1]
+            if len(constant) < len(selected):
+                for index in constant:
+                    lines.append(f"{selected[index]}: {unique_rows[0][index]}")
+                keep = [index for index in range(len(selected)) if index not in constant]
+                table_columns = [selected[index] for index in keep]
+                unique_rows = list(dict.fromkeys(
+                    tuple(row[index] for index in keep) for row in unique_rows))
+
+        lines.append(" | ".join(table_columns))
+        used = estimate_tokens("\n".join(lines))
+        kept = 0
+        for row in unique_rows:
+            line = " | ".join(row)
+            cost = estimate_tokens(line) + 1
+            if kept and used + cost > self.token_budget:
+                break
+            lines.append(line)
+            used += cost
+            kept += 1
+        if kept < len(unique_rows):
+            lines.extend(self.summary(table_columns, unique_rows[kept:]))
+
+        return "\n".join(lines), {
+            "rows": len(rows),
+            "rows_kept": kept,
+            "columns": selected,
+            "columns_dropped": [column for column in columns if column not in selected],
+        }
+
+    def compact(self, question: str, rows):
+        """Returns the context string and a report of what it saved."""
+        text, report = self.render(question, rows)
+        # The QA prompt used to receive str(rows); that is the baseline.
+        raw = estimate_tokens(str(rows))
+        compact = estimate_tokens(text)
+        report.update(raw_tokens=raw, compact_tokens=compact,
+                      saved_tokens=max(raw - compact, 0))
+        with self._lock:
+            self.requests += 1
+            self.raw_tokens += raw
+            self.compact_tokens += compact
+        return text, report
+
+    def stats(self):
+        return {"requests": self.requests,
+                "token_budget": self.token_budget,
+                "raw_tokens": self.raw_tokens,
+                "compact_tokens": self.compact_tokens,
+                "saved_tokens": max(self.raw_tokens - self.compact_tokens, 0)}
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from .exceptions import QueueFullError, QueueTimeoutError
+
+
+class ConcurrencyLimiter:
+    """Runs blocking work on a sized thread pool with a bounded wait queue.
+
+    At most ``max_concurrency`` calls execute at once. Up to ``max_queue``
+    further calls may wait for a slot; beyond that callers get
+    ``QueueFullError``. A caller that waits longer than ``queue_timeout``
+    seconds gets ``QueueTimeoutError``.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 32,
+                 queue_timeout: float = 30.0) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="llm")
+        self._semaphore = None
+
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.max_queue_depth_seen = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _get_semaphore(self):
+        # Created lazily so it binds to the running event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def acquire(self):
+        semaphore = self._get_semaphore()
+        if self.in_flight + self.queue_depth >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(
+                f"{self.queue_depth} requests already waiting")
+
+        self.queue_depth += 1
+        self.max_queue_depth_seen = max(
+            self.max_queue_depth_seen, self.queue_depth)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise QueueTimeoutError(
+                f"waited more than {self.queue_timeout}s for a free slot")
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.perf_counter() - started
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._get_semaphore().release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def run(self, fn, *args):
+        async with self.slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def iterate(self, iterator):
+        """Drives a blocking iterator on the pool, one ``next`` at a time.
+        The caller is responsible for holding a slot."""
+        loop = asyncio.get_running_loop()
+        done = object()
+        while True:
+            item = await loop.run_in_executor(self.executor, next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth_seen": self.max_queue_depth_seen,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_seconds": self.total_wait / self.admitted if self.admitted else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
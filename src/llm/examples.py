@@ -0,0 +1,7 @@
+# Example questions shown in the frontend and mixed into the load
+# generator's corpus.
+PREDEFINED_MESSAGES = [
+    "Who is Rebecca Carroll's tech mentor?",
+    "Who are the tech mentee of Rebecca Carroll?",
+    "Who are part of project Compliance Management System?"
+]
@@ -0,0 +1,10 @@
+class OverloadedError(Exception):
+    """Raised when a request cannot be admitted by the concurrency limiter."""
+
+
+class QueueFullError(OverloadedError):
+    """The wait queue is at capacity; the request was rejected immediately."""
+
+
+class QueueTimeoutError(OverloadedError):
+    """The request waited in the queue longer than allowed."""
@@ -0,0 +1,305 @@
+import re
+import threading
+from array import array
+from itertools import product
+
+from .cache import LRUCache
+from .intents import EntityIndex
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9\-]+")
+# Candidate spellings kept per question word.
+MAX_WORD_CANDIDATES = 5
+# Words of the questions themselves. They are never rewritten into a name,
+# only kept when a name contains them as spelled ("Project Manager").
+QUESTION_WORDS = frozenset("""
+    a about all also an and any are as at be below boss by can career
+    colleague colleagues could department departments did do does each else
+    employee employees every everybody everyone find for from full give has
+    have he her his how i id ids in is it its job jobs list manager managers
+    many me members mentee mentees mentor mentors much my name names not
+    number of on or other others part people person position positions
+    project projects report reporting reports role roles same she show team
+    tech tell that the their them they this title titles to under was we
+    were what when where which who whom whose with work worked working works
+    you your
+""".split())
+
+# A few words of a project name stand for the project only in a question
+# about projects; "Quality Assurance" alone is a department.
+PROJECT_CUE_PATTERN = re.compile(
+    r"\b(?:projects?|works? on|worked on|working on|part of|members?)\b", re.IGNORECASE)
+
+
+def max_edits(length: int) -> int:
+    # Short words are too easy to turn into a different real word, and a
+    # second edit turns most words of up to seven letters into a name.
+    if length < 4:
+        return 0
+    return 1 if length < 8 else 2
+
+
+def index_depth(length: int) -> int:
+    """Deletions indexed for a vocabulary word of ``length``: the most edits
+    any question word it can match may have."""
+    return max(max_edits(other) for other in range(length - 2, length + 3)
+               if abs(other - length) <= max_edits(other))
+
+
+def deletions(word: str, depth: int):
+    """``word`` and every string left after removing up to ``depth`` of its
+    characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {text[:i] + text[i + 1:] for text in frontier for i in range(len(text))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (an adjacent transposition counts
+    as one edit), or ``limit + 1`` once it is known to exceed ``limit``.
+    Only the diagonal band of width ``limit`` is computed."""
+    too_far = limit + 1
+    if abs(len(a) - len(b)) > limit:
+        return too_far
+    before = None
+    previous = [j if j <= limit else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        for j in range(low, high + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1,
+                        previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+        if min(current[low - 1:high + 1]) > limit:
+            return too_far
+        before, previous = previous, current
+    return min(previous[-1], too_far)
+
+
+def tokenize(question: str):
+    """Normalized words of ``question`` (as ``normalize_name`` splits them)
+    with their character spans and whether they were capitalised, so a
+    match can be replaced in place."""
+    text = question.replace("’", "'")
+    return [(match.group(0).lower(), match.start(), match.end(), match.group(0)[0].isupper())
+            for match in TOKEN_PATTERN.finditer(text)
+            # "Carroll's" -> "carroll"
+            if not (match.group(0).lower() == "s" and text[match.start() - 1:match.start()] == "'")]
+
+
+class Resolution:
+    __slots__ = ("kind", "mention", "name", "distance", "partial")
+
+    def __init__(self, kind, mention, name, distance, partial=False) -> None:
+        self.kind = kind
+        self.mention = mention
+        self.name = name
+        self.distance = distance
+        self.partial = partial
+
+    def as_dict(self):
+        return {"kind": self.kind, "mention": self.mention, "name": self.name,
+                "distance": self.distance, "partial": self.partial}
+
+
+class FuzzyNameIndex:
+    """Misspelling-tolerant lookup over the names in an ``EntityIndex``.
+
+    Names are matched word by word: every distinct word of every name goes
+    into a small vocabulary indexed by its deletion neighbourhood (the
+    strings left after deleting up to two letters), each question word is
+    resolved to its closest vocabulary words (one edit for words of four to
+    seven letters, two for longer ones, none for shorter ones), and the
+    combinations are looked up as whole names in the ``EntityIndex``. The
+    vocabulary is a few thousand words even for a million people, so a
+    lookup is a few dozen dictionary probes. In a question about projects,
+    two or more words of a project name also resolve to it when no other
+    project contains them.
+
+    ``QUESTION_WORDS`` are only matched as spelled, and a mention needs a
+    capitalised word or one that is neither a name word nor a question
+    word, so ordinary questions are left alone.
+    """
+
+    def __init__(self, index: EntityIndex) -> None:
+        self.index = index
+        self.kinds = {"person": index.people, "project": index.projects}
+        self.lengths = {kind: {len(key.split()) for key in names}
+                        for kind, names in self.kinds.items()}
+        vocabulary = {}
+        for names in self.kinds.values():
+            for key in names:
+                for word in key.split():
+                    vocabulary.setdefault(word, len(vocabulary))
+        self.vocabulary = vocabulary
+        self.words = list(vocabulary)
+        neighbourhoods = {}
+        for word_id, word in enumerate(self.words):
+            for text in deletions(word, index_depth(len(word))):
+                neighbourhoods.setdefault(text, []).append(word_id)
+        self.neighbourhoods = {text: array("I", ids) for text, ids in neighbourhoods.items()}
+        self.project_words = {}
+        for key in index.projects:
+            for word in key.split():
+                self.project_words.setdefault(word, set()).add(key)
+        self._matches = LRUCache(max_size=10000)
+
+    def word_matches(self, word: str):
+        """Returns [(vocabulary word, distance)], closest first."""
+        if word in QUESTION_WORDS:
+            return [(word, 0)] if word in self.vocabulary else []
+        matches = self._matches.get(word)
+        if matches is not None:
+            return matches
+        limit = max_edits(len(word))
+        # Two words within ``limit`` edits share a string reachable from
+        # both by at most ``limit`` deletions.
+        candidates = set()
+        for text in deletions(word, limit):
+            candidates.update(self.neighbourhoods.get(text, ()))
+        matches = []
+        for word_id in candidates:
+            candidate = self.words[word_id]
+            distance = edit_distance(word, candidate, limit)
+            if distance <= limit:
+                matches.append((candidate, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        matches = matches[:MAX_WORD_CANDIDATES]
+        self._matches.set(word, matches)
+        return matches
+
+    def lookup(self, words):
+        """Returns (kind, canonical name, distance) of the closest name
+        spelled by ``words``, or None."""
+        candidates = [self.word_matches(word) for word in words]
+        if not all(candidates):
+            return None
+        best = None
+        for combination in product(*candidates):
+            key = " ".join(word for word, _ in combination)
+            distance = sum(distance for _, distance in combination)
+            for kind, names in self.kinds.items():
+                if key in names and (best is None or distance < best[2]):
+                    best = (kind, names[key], distance)
+        return best
+
+    def lookup_partial(self, words):
+        """The only project whose name contains all of ``words``, or None."""
+        if len(words) < 2:
+            return None
+        found = None
+        distance = 0
+        for word in words:
+            matches = self.word_matches(word)
+            projects = set().union(*(self.project_words.get(match, ()) for match, _ in matches))
+            found = projects if found is None else found & projects
+            if not found:
+                return None
+            distance += matches[0][1]
+        if len(found) != 1:
+            return None
+        key, = found
+        return "project", self.index.projects[key], distance
+
+    def mentions_name(self, tokens) -> bool:
+        # A name is capitalised, or misspelled into a word nobody uses.
+        return any(capitalised or (word not in self.vocabulary and word not in QUESTION_WORDS)
+                   for word, _, _, capitalised in tokens)
+
+    def resolve(self, question: str):
+        """Returns the question with misspelled or partial entity names
+        replaced by their canonical form, and the ``Resolution`` list."""
+        tokens = tokenize(question)
+        words = [token[0] for token in tokens]
+        taken = [False] * len(words)
+        longest = max(self.index.max_tokens, 1)
+
+        def spans():
+            for size in range(min(longest, len(words)), 0, -1):
+                for start in range(len(words) - size + 1):
+                    if not any(taken[start:start + size]):
+                        yield start, start + size
+
+        # Names spelled exactly are left alone and never partly rewritten.
+        for start, end in spans():
+            key = " ".join(words[start:end])
+            if key in self.index.people or key in self.index.projects:
+                taken[start:end] = [True] * (end - start)
+
+        # Every remaining span is scored, then the best are taken first:
+        # whole names before partial projects, then the share of the name
+        # covered, the fewest edits and the longest span.
+        partial_projects = PROJECT_CUE_PATTERN.search(question) is not None
+        candidates = []
+        for start, end in spans():
+            if not self.mentions_name(tokens[start:end]):
+                continue
+            span = words[start:end]
+            match = None
+            if any(end - start in lengths for lengths in self.lengths.values()):
+                match = self.lookup(span)
+            partial = match is None
+            if partial and partial_projects:
+                match = self.lookup_partial(span)
+            if match is not None:
+                kind, name, distance = match
+                coverage = (end - start) / len(name.split())
+                candidates.append(((partial, -coverage, distance, start - end, start),
+                                   start, end, Resolution(
+                                       kind, question[tokens[start][1]:tokens[end - 1][2]],
+                                       name, distance, partial)))
+
+        found = []
+        for _, start, end, resolution in sorted(candidates, key=lambda item: item[0]):
+            if any(taken[start:end]):
+                continue
+            taken[start:end] = [True] * (end - start)
+            found.append((tokens[start][1], tokens[end - 1][2], resolution))
+
+        for start, end, resolution in sorted(found, key=lambda item: -item[0]):
+            question = question[:start] + resolution.name + question[end:]
+        return question, [resolution for _, _, resolution in sorted(found, key=lambda item: item[0])]
+
+
+class EntityResolver:
+    """Rewrites entity mentions in questions to canonical names before they
+    reach the intent router or the Cypher prompt, so a misspelled name does
+    not produce a query that returns nothing. The index is swapped whole
+    when the data changes; the counters survive."""
+
+    def __init__(self, index: FuzzyNameIndex = None) -> None:
+        self.index = index or FuzzyNameIndex(EntityIndex())
+        self.questions = 0
+        self.resolved = 0
+        self.empty_results_prevented = 0
+        self._lock = threading.Lock()
+
+    def set_index(self, index: FuzzyNameIndex):
+        self.index = index
+
+    def resolve(self, question: str):
+        question, resolutions = self.index.resolve(question)
+        with self._lock:
+            self.questions += 1
+            if resolutions:
+                self.resolved += 1
+        return question, resolutions
+
+    def record(self, resolutions, rows):
+        # The original spelling matches no name, so without the rewrite the
+        # query would have come back empty.
+        if resolutions and rows:
+            with self._lock:
+                self.empty_results_prevented += 1
+
+    def stats(self):
+        return {"questions": self.questions,
+                "resolved": self.resolved,
+                "empty_results_prevented": self.empty_results_prevented,
+                "vocabulary": len(self.index.words)}
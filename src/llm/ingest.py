@@ -0,0 +1,413 @@
+import csv
+import gzip
+import hashlib
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "data.csv")
+
+SCHEMA_QUERIES = [
+    "CREATE CONSTRAINT person_id IF NOT EXISTS FOR (p:Person) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT project_name IF NOT EXISTS FOR (p:Project) REQUIRE p.name IS UNIQUE",
+    "CREATE INDEX person_full_name IF NOT EXISTS FOR (p:Person) ON (p.full_name)",
+]
+
+PERSON_QUERY = """
+UNWIND $rows AS row
+MERGE (p:Person {id: row.id})
+SET p.full_name = row.full_name,
+    p.position = row.position,
+    p.department = row.department,
+    p.career_mentor = row.career_mentor,
+    p.tech_mentor = row.tech_mentor,
+    p.project = row.project,
+    p.row_hash = row.row_hash
+"""
+
+PROJECT_QUERY = """
+UNWIND $rows AS name
+MERGE (:Project {name: name})
+"""
+
+CAREER_MENTOR_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {id: row.id})
+MATCH (m:Person {id: row.mentor_id})
+MERGE (m)-[:IS_CAREER_MENTOR_OF]->(p)
+MERGE (p)-[:IS_CAREER_MENTEE_OF]->(m)
+"""
+
+TECH_MENTOR_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {id: row.id})
+MATCH (m:Person {id: row.mentor_id})
+MERGE (m)-[:IS_TECH_MENTOR_OF]->(p)
+MERGE (p)-[:IS_TECH_MENTEE_OF]->(m)
+"""
+
+WORKS_ON_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {id: row.id})
+MATCH (proj:Project {name: row.project})
+MERGE (p)-[:WORKS_ON]->(proj)
+"""
+
+# The compact model stores each relationship once, as a mentor -> mentee
+# edge, and leaves out the career_mentor, tech_mentor and project
+# properties that only repeat the edges.
+COMPACT_PERSON_QUERY = """
+UNWIND $rows AS row
+MERGE (p:Person {id: row.id})
+SET p.full_name = row.full_name,
+    p.position = row.position,
+    p.department = row.department,
+    p.row_hash = row.row_hash
+"""
+
+COMPACT_CAREER_MENTOR_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {id: row.id})
+MATCH (m:Person {id: row.mentor_id})
+MERGE (m)-[:IS_CAREER_MENTOR_OF]->(p)
+"""
+
+COMPACT_TECH_MENTOR_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {id: row.id})
+MATCH (m:Person {id: row.mentor_id})
+MERGE (m)-[:IS_TECH_MENTOR_OF]->(p)
+"""
+
+COMPACT_PERSON_PROPERTIES = ("id", "full_name", "position", "department", "row_hash")
+
+# model -> (person, career mentor, tech mentor) queries
+GRAPH_MODELS = {
+    "full": (PERSON_QUERY, CAREER_MENTOR_QUERY, TECH_MENTOR_QUERY),
+    "compact": (COMPACT_PERSON_QUERY, COMPACT_CAREER_MENTOR_QUERY, COMPACT_TECH_MENTOR_QUERY),
+}
+
+# Delta ingest. Every Person keeps ``row_hash``, a hash of the CSV row it
+# was loaded from, so a new file can be diffed against the graph by id.
+ROW_HASH_COLUMNS = ("id", "full_name", "position", "department", "career_mentor",
+                    "tech_mentor", "project")
+
+ROW_HASHES_QUERY = "MATCH (p:Person) RETURN p.id AS id, p.row_hash AS row_hash, p.full_name AS full_name"
+
+ROW_HASH_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Person {id: row.id})
+SET p.row_hash = row.row_hash
+"""
+
+DELETE_PERSONS_QUERY = """
+UNWIND $rows AS id
+MATCH (p:Person {id: id})
+DETACH DELETE p
+"""
+
+# A row owns the edges to its mentors and projects; edges to its mentees
+# belong to the mentees' rows.
+CLEAR_MENTOR_EDGES_QUERY = """
+UNWIND $rows AS id
+MATCH (:Person)-[r:IS_CAREER_MENTOR_OF|IS_TECH_MENTOR_OF]->(:Person {id: id})
+DELETE r
+"""
+
+CLEAR_MENTEE_EDGES_QUERY = """
+UNWIND $rows AS id
+MATCH (:Person {id: id})-[r:IS_CAREER_MENTEE_OF|IS_TECH_MENTEE_OF]->(:Person)
+DELETE r
+"""
+
+CLEAR_WORKS_ON_QUERY = """
+UNWIND $rows AS id
+MATCH (:Person {id: id})-[r:WORKS_ON]->(:Project)
+DELETE r
+"""
+
+DELETE_ORPHAN_PROJECTS_QUERY = """
+MATCH (proj:Project)
+WHERE NOT (proj)<-[:WORKS_ON]-()
+DELETE proj
+"""
+
+
+def open_data(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode="rt", newline="", encoding="utf-8")
+    return open(path, mode="r", newline="", encoding="utf-8")
+
+
+def read_rows(path: str):
+    with open_data(path) as file:
+        for row in csv.DictReader(file):
+            yield {key: (value or "").strip() for key, value in row.items()}
+
+
+def parse_projects(value: str):
+    # Projects are written by populate.py as a stringified Python list.
+    cleaned = value.replace("[", "").replace("]", "").replace("'", "")
+    return [name.strip() for name in cleaned.split(", ")
+            if name.strip() and name.strip() != "None"]
+
+
+def row_hash(row: dict) -> str:
+    content = "\x1f".join(row.get(column, "") for column in ROW_HASH_COLUMNS)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def batched(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BulkIngest:
+    """Loads the HR CSV into Neo4j in ``UNWIND $rows`` batches.
+
+    Nodes are written first (Person batches, then Project batches) so the
+    relationship phase can MATCH both endpoints through the unique
+    constraints. Batches within a phase run on ``workers`` threads; each
+    batch is its own transaction, retried by the driver on transient errors
+    such as deadlocks.
+
+    ``model`` is a key of ``GRAPH_MODELS``.
+    """
+
+    def __init__(self, graphDB_instance, batch_size: int = 5000, workers: int = 4,
+                 model: str = "full") -> None:
+        if model not in GRAPH_MODELS:
+            raise ValueError(f"Unknown graph model: {model}")
+        self.graphDB_instance = graphDB_instance
+        self.batch_size = batch_size
+        self.workers = workers
+        self.model = model
+        self.person_query, self.career_mentor_query, self.tech_mentor_query = GRAPH_MODELS[model]
+
+    def _run_batches(self, executor, query, batches):
+        # Keep a bounded window of submitted batches so a very large file
+        # is never materialised as futures all at once.
+        pending = set()
+        count = 0
+        for batch in batches:
+            if len(pending) >= self.workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(
+                self.graphDB_instance.write, query, {"rows": batch}))
+            count += len(batch)
+        for future in pending:
+            future.result()
+        return count
+
+    def create_schema(self):
+        for query in SCHEMA_QUERIES:
+            self.graphDB_instance.write(query)
+
+    def person_row(self, row: dict, hashed: bool = True):
+        # ``hashed=False`` clears the hash so a delta that fails part-way
+        # leaves the row marked as changed for the next run.
+        row = dict(row, row_hash=row_hash(row) if hashed else None)
+        if self.model == "compact":
+            row = {key: row.get(key, "") for key in COMPACT_PERSON_PROPERTIES}
+        return row
+
+    def load_nodes(self, executor, rows):
+        ids_by_name = {}
+        projects = {}
+
+        def people():
+            for row in rows:
+                ids_by_name.setdefault(row["full_name"], row["id"])
+                for name in parse_projects(row.get("project", "")):
+                    projects[name] = None
+                yield self.person_row(row)
+
+        persons = self._run_batches(
+            executor, self.person_query, batched(people(), self.batch_size))
+        project_count = self._run_batches(
+            executor, PROJECT_QUERY, batched(projects, self.batch_size))
+        return ids_by_name, persons, project_count
+
+    def relationship_rows(self, rows, ids_by_name, column):
+        for row in rows:
+            mentor_id = ids_by_name.get(row.get(column, ""))
+            if mentor_id and mentor_id != row["id"]:
+                yield {"id": row["id"], "mentor_id": mentor_id}
+
+    def project_rows(self, rows):
+        for row in rows:
+            for name in parse_projects(row.get("project", "")):
+                yield {"id": row["id"], "project": name}
+
+    def load_relationships(self, executor, rows_factory, ids_by_name):
+        phases = [
+            (self.career_mentor_query, self.relationship_rows(
+                rows_factory(), ids_by_name, "career_mentor")),
+            (self.tech_mentor_query, self.relationship_rows(
+                rows_factory(), ids_by_name, "tech_mentor")),
+            (WORKS_ON_QUERY, self.project_rows(rows_factory())),
+        ]
+        return [self._run_batches(executor, query, batched(rows, self.batch_size))
+                for query, rows in phases]
+
+    def run(self, rows_factory):
+        """``rows_factory`` returns a fresh iterator over the CSV rows; it is
+        called once per pass so the file is streamed rather than held in
+        memory."""
+        started = time.perf_counter()
+        self.create_schema()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest") as executor:
+            ids_by_name, persons, projects = self.load_nodes(executor, rows_factory())
+            nodes_done = time.perf_counter()
+            career, tech, works_on = self.load_relationships(
+                executor, rows_factory, ids_by_name)
+
+        finished = time.perf_counter()
+        seconds = finished - started
+        return {
+            "rows": persons,
+            "persons": persons,
+            "projects": projects,
+            "career_mentorships": career,
+            "tech_mentorships": tech,
+            "works_on": works_on,
+            "mode": "full",
+            "model": self.model,
+            "batch_size": self.batch_size,
+            "workers": self.workers,
+            "node_seconds": nodes_done - started,
+            "relationship_seconds": finished - nodes_done,
+            "seconds": seconds,
+            "rows_per_sec": persons / seconds if seconds else 0.0,
+        }
+
+    def run_file(self, path: str = None):
+        path = path or DEFAULT_DATA_PATH
+        stats = self.run(lambda: read_rows(path))
+        stats["path"] = path
+        return stats
+
+    def diff(self, rows):
+        """Compares ``rows`` with the hashes stored in the graph.
+
+        Returns (row count, ids_by_name, inserted, updated, deleted,
+        affected_names) where the id sets are keyed on ``id`` and
+        ``affected_names`` are the names whose mentor lookup may now
+        resolve to someone else.
+        """
+        previous = {row["id"]: (row["row_hash"], row["full_name"])
+                    for row in self.graphDB_instance.graphDB.query(ROW_HASHES_QUERY)}
+        ids_by_name = {}
+        hashes = {}
+        names = {}
+        for row in rows:
+            ids_by_name.setdefault(row["full_name"], row["id"])
+            hashes[row["id"]] = row_hash(row)
+            names[row["id"]] = row["full_name"]
+        inserted = hashes.keys() - previous.keys()
+        deleted = previous.keys() - hashes.keys()
+        updated = {person_id for person_id, value in hashes.items()
+                   if person_id in previous and previous[person_id][0] != value}
+        renamed = {person_id for person_id in updated if previous[person_id][1] != names[person_id]}
+        affected_names = ({previous[person_id][1] for person_id in renamed | deleted}
+                          | {names[person_id] for person_id in renamed | inserted})
+        return len(hashes), ids_by_name, inserted, updated, deleted, affected_names
+
+    def run_delta(self, rows_factory):
+        """Applies only what changed since the last load: inserts, updates
+        and deletes by ``id``. Changed rows get their mentor and WORKS_ON
+        edges rebuilt, as do unchanged rows whose mentor's name now
+        resolves differently; projects nobody works on any more are
+        removed. ``rows_factory`` is used as in ``run``."""
+        started = time.perf_counter()
+        self.create_schema()
+        rows, ids_by_name, inserted, updated, deleted, affected_names = self.diff(rows_factory())
+        changed = inserted | updated
+        if rows and len(inserted) == rows and not deleted:
+            # Nothing loaded yet: a plain bulk load writes the same graph
+            # without holding the rows.
+            stats = self.run(rows_factory)
+            stats.update(mode="delta", changed=True, touched=rows, inserted=rows, updated=0,
+                         deleted=0, unchanged=0, rewired=rows, projects_deleted=0)
+            return stats
+
+        # Deltas are small, so the rows that are rewritten are kept in
+        # memory rather than re-reading the file for every phase.
+        rewired_rows = [row for row in rows_factory()
+                        if row["id"] in changed or row.get("career_mentor") in affected_names
+                        or row.get("tech_mentor") in affected_names]
+        changed_rows = [row for row in rewired_rows if row["id"] in changed]
+        rewired = {row["id"] for row in rewired_rows}
+        projects_deleted = 0
+        career = tech = works_on = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest") as executor:
+            def apply(query, items):
+                return self._run_batches(executor, query, batched(items, self.batch_size))
+
+            if deleted:
+                apply(DELETE_PERSONS_QUERY, deleted)
+            if changed:
+                apply(self.person_query, (self.person_row(row, hashed=False)
+                                        for row in changed_rows))
+                apply(PROJECT_QUERY, dict.fromkeys(
+                    name for row in changed_rows
+                    for name in parse_projects(row.get("project", ""))))
+            cleared = rewired - inserted
+            if cleared:
+                apply(CLEAR_MENTOR_EDGES_QUERY, cleared)
+                if self.model == "full":
+                    apply(CLEAR_MENTEE_EDGES_QUERY, cleared)
+            if updated:
+                apply(CLEAR_WORKS_ON_QUERY, updated)
+            if rewired:
+                career = apply(self.career_mentor_query, self.relationship_rows(
+                    rewired_rows, ids_by_name, "career_mentor"))
+                tech = apply(self.tech_mentor_query, self.relationship_rows(
+                    rewired_rows, ids_by_name, "tech_mentor"))
+            if changed:
+                works_on = apply(WORKS_ON_QUERY, self.project_rows(changed_rows))
+            if updated or deleted:
+                projects_deleted = self.graphDB_instance.write(
+                    DELETE_ORPHAN_PROJECTS_QUERY).nodes_deleted
+            if changed:
+                apply(ROW_HASH_QUERY, ({"id": row["id"], "row_hash": row_hash(row)}
+                                     for row in changed_rows))
+
+        seconds = time.perf_counter() - started
+        touched = len(inserted) + len(updated) + len(deleted)
+        return {
+            "mode": "delta",
+            "changed": bool(touched),
+            "rows": rows,
+            "touched": touched,
+            "inserted": len(inserted),
+            "updated": len(updated),
+            "deleted": len(deleted),
+            "unchanged": rows - len(changed),
+            "rewired": len(rewired),
+            "career_mentorships": career,
+            "tech_mentorships": tech,
+            "works_on": works_on,
+            "projects_deleted": projects_deleted,
+            "model": self.model,
+            "batch_size": self.batch_size,
+            "workers": self.workers,
+            "seconds": seconds,
+            "rows_per_sec": rows / seconds if seconds else 0.0,
+        }
+
+    def run_delta_file(self, path: str = None):
+        path = path or DEFAULT_DATA_PATH
+        stats = self.run_delta(lambda: read_rows(path))
+        stats["path"] = path
+        return stats
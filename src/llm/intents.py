@@ -0,0 +1,265 @@
+import re
+
+
+def normalize_name(text: str) -> str:
+    text = text.lower().replace("’", "'")
+    text = re.sub(r"'s\b", "", text)
+    text = re.sub(r"[^a-z0-9\-]+", " ", text)
+    return " ".join(text.split())
+
+
+def join_names(names, last_separator: str = ", ") -> str:
+    names = list(names)
+    if len(names) <= 1:
+        return "".join(names)
+    return ", ".join(names[:-1]) + last_separator + names[-1]
+
+
+def unique(values):
+    return list(dict.fromkeys(v for v in values if v not in (None, "")))
+
+
+class EntityIndex:
+    """In-memory lookup of Person.full_name and Project.name.
+
+    Names are stored normalized so that a question can be matched by looking
+    up its word n-grams directly instead of scanning every known name.
+    """
+
+    def __init__(self, people=(), projects=()) -> None:
+        self.people = {}
+        self.projects = {}
+        self.max_tokens = 1
+        for name in people:
+            self._add(self.people, name)
+        for name in projects:
+            self._add(self.projects, name)
+
+    def _add(self, index, name):
+        if not name:
+            return
+        key = normalize_name(name)
+        if key:
+            index.setdefault(key, name)
+            self.max_tokens = max(self.max_tokens, len(key.split()))
+
+    @classmethod
+    def load(cls, graph_db):
+        people = [row["name"] for row in graph_db.query(
+            "MATCH (p:Person) RETURN p.full_name AS name")]
+        projects = [row["name"] for row in graph_db.query(
+            "MATCH (p:Project) RETURN p.name AS name")]
+        return cls(people, projects)
+
+    def __len__(self):
+        return len(self.people) + len(self.projects)
+
+    def find(self, tokens):
+        """Returns (kind, canonical name, start, end) of the longest known
+        name in ``tokens``, or None."""
+        for size in range(min(self.max_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                key = " ".join(tokens[start:start + size])
+                if key in self.people:
+                    return "person", self.people[key], start, start + size
+                if key in self.projects:
+                    return "project", self.projects[key], start, start + size
+        return None
+
+
+def _mentor_answer(kind):
+    def render(name, values):
+        if len(values) == 1:
+            return f"{values[0]} is the {kind} mentor of {name}"
+        return f"{join_names(values, ', and ')} are the {kind} mentors of {name}"
+    return render
+
+
+def _mentee_answer(kind):
+    def render(name, values):
+        return f"{kind.capitalize()} mentee of {name} are: {join_names(values)}"
+    return render
+
+
+def _property_answer(label):
+    def render(name, values):
+        return f"The {label} of {name} is {join_names(values, ', and ')}"
+    return render
+
+
+# intent -> (entity kind, trigger pattern, parameterized query, answer template)
+INTENTS = {
+    "career_mentees": (
+        "person", r"\bcareer mentees?\b",
+        "MATCH (p:Person {full_name: $name})-[:IS_CAREER_MENTOR_OF]->(m:Person) "
+        "RETURN m.full_name AS value ORDER BY value",
+        _mentee_answer("career")),
+    "tech_mentees": (
+        "person", r"\btech mentees?\b",
+        "MATCH (p:Person {full_name: $name})-[:IS_TECH_MENTOR_OF]->(m:Person) "
+        "RETURN m.full_name AS value ORDER BY value",
+        _mentee_answer("tech")),
+    "career_mentor": (
+        "person", r"\bcareer mentors?\b",
+        "MATCH (m:Person)-[:IS_CAREER_MENTOR_OF]->(p:Person {full_name: $name}) "
+        "RETURN m.full_name AS value ORDER BY value",
+        _mentor_answer("career")),
+    "tech_mentor": (
+        "person", r"\btech mentors?\b",
+        "MATCH (m:Person)-[:IS_TECH_MENTOR_OF]->(p:Person {full_name: $name}) "
+        "RETURN m.full_name AS value ORDER BY value",
+        _mentor_answer("tech")),
+    "department": (
+        "person", r"\bdepartments?\b",
+        "MATCH (p:Person {full_name: $name}) RETURN p.department AS value",
+        _property_answer("department")),
+    "id": (
+        "person", r"\bids?\b",
+        "MATCH (p:Person {full_name: $name}) RETURN p.id AS value",
+        _property_answer("id")),
+    "full_name": (
+        "person", r"\bfull(?: |_)?name\b",
+        "MATCH (p:Person {full_name: $name}) RETURN p.full_name AS value",
+        _property_answer("full name")),
+    "position": (
+        "person", r"\b(?:position|role|title|job)s?\b",
+        "MATCH (p:Person {full_name: $name}) RETURN p.position AS value",
+        _property_answer("position")),
+    "projects": (
+        "person", r"\bprojects?\b",
+        "MATCH (p:Person {full_name: $name})-[:WORKS_ON]->(proj:Project) "
+        "RETURN proj.name AS value ORDER BY value",
+        lambda name, values: f"{name} worked on {join_names(values, ', and ')}"),
+    "project_members": (
+        # Who works on the project, not which department does or who leads it.
+        "project", r"^(?:who|which (?:people|employees)|find|list|show)\b"
+                   r"(?!.*\b(?:departments?|positions?|roles?|leads?|led|heads?|managers?|starts?|started)\b)"
+                   r".*\b(?:works? on|worked on|working on|part of|members?|people|employees|person|everyone|on)\b",
+        "MATCH (p:Person)-[:WORKS_ON]->(proj:Project {name: $name}) "
+        "RETURN p.full_name AS value ORDER BY value",
+        lambda name, values: f"Employees who worked on {name} are: {join_names(values)}"),
+    "reports": (
+        # Anchored, with the name last: "who reports to X", "who is under X",
+        # "find everyone under X", but not "who does X report to".
+        "person", r"^(?:who|which (?:people|employees)|(?:find |list )?(?:everyone|everybody|all people"
+                  r"|all employees|people|employees))(?: (?:reports?|reporting|is reporting|are reporting)"
+                  r" to| (?:is |are |works? |working )?(?:under|below))$",
+        "MATCH (p:Person {full_name: $name})-[:IS_CAREER_MENTOR_OF*1..]->(m:Person) "
+        "RETURN DISTINCT m.full_name AS value ORDER BY value",
+        lambda name, values: f"People under {name} are: {join_names(values)}"),
+}
+
+NO_ANSWER = "I don't know the answer."
+
+# Counting, comparing or excluding changes what the question asks for, so
+# these are left to the LLM even when an intent word is present. Matched
+# against normalized text, where "isn't" is "isn t".
+UNSUPPORTED_QUESTION_PATTERN = re.compile(
+    r"\b(?:how many|number of|count|same|else|other|others|not|\w+n t|never|without"
+    r"|share|shares|shared|sharing|besides|except|than|both)\b"
+    # "the tech lead of X", "the head of X's department": about someone else.
+    r"|\b(?:leads?|heads?|managers?|boss|bosses|supervisors?|colleagues?|peers?|teammates?)\b")
+# Counts and yes/no questions need an answer the templates do not write.
+COUNT_OR_YES_NO_PATTERN = re.compile(
+    r"\b(?:how many|number of)\b|^\s*(?:is|are|was|were|does|do|did|has|have|can)\b",
+    re.IGNORECASE)
+
+NAME_LITERAL_PATTERN = re.compile(r"\{(full_name|name): '((?:[^'\\]|\\.)*)'\}")
+NAME_PARAMETER_PATTERN = re.compile(r"\{(full_name|name): \$(\w+)\}")
+
+
+def parameterize_name(cypher: str, params: dict = None):
+    """Turns ``{full_name: 'X'}`` (as an LLM writes it) or
+    ``{full_name: $other}`` back into ``{full_name: $name}`` so the query
+    can be compared with the intent queries. Returns the query and its
+    parameters."""
+    params = dict(params or {})
+    if "$name" in cypher:
+        return cypher, params
+    match = NAME_LITERAL_PATTERN.search(cypher)
+    if match:
+        params["name"] = match.group(2).replace("\\'", "'").replace("\\\\", "\\")
+    else:
+        match = NAME_PARAMETER_PATTERN.search(cypher)
+        if not match or match.group(2) not in params:
+            return cypher, params
+        params["name"] = params.pop(match.group(2))
+    cypher = cypher[:match.start()] + "{" + match.group(1) + ": $name}" + cypher[match.end():]
+    return cypher, params
+
+
+class IntentMatch:
+    __slots__ = ("intent", "entity", "cypher", "params", "_render")
+
+    def __init__(self, intent, entity, cypher, render) -> None:
+        self.intent = intent
+        self.entity = entity
+        self.cypher = cypher
+        self.params = {"name": entity}
+        self._render = render
+
+    def render(self, rows) -> str:
+        values = unique(str(row["value"]) for row in rows)
+        if not values:
+            return NO_ANSWER
+        return self._render(self.entity, values)
+
+
+class IntentRouter:
+    """Answers the closed set of canonical questions (the forms listed in
+    ``Service.rephrase_prompt``) with fixed parameterized Cypher.
+
+    A question matches only when it names exactly one known entity, exactly
+    one intent applies to it, it is not a yes/no question and it does not
+    count, compare, exclude or ask about someone related to the entity
+    (``UNSUPPORTED_QUESTION_PATTERN``); anything else returns None and is
+    left to the LLM chain.
+    """
+
+    def __init__(self, index: EntityIndex = None) -> None:
+        self.index = index or EntityIndex()
+        self.matched = 0
+        self.unmatched = 0
+
+    def set_index(self, index: EntityIndex):
+        self.index = index
+
+    def match(self, question: str):
+        if COUNT_OR_YES_NO_PATTERN.search(question):
+            self.unmatched += 1
+            return None
+        tokens = normalize_name(question).split()
+        found = self.index.find(tokens)
+        if found is None:
+            self.unmatched += 1
+            return None
+
+        kind, entity, start, end = found
+        if self.index.find(tokens[:start]) or self.index.find(tokens[end:]):
+            # Questions relating two entities need the LLM.
+            self.unmatched += 1
+            return None
+
+        rest = " ".join(tokens[:start] + tokens[end:])
+        if UNSUPPORTED_QUESTION_PATTERN.search(rest):
+            self.unmatched += 1
+            return None
+        candidates = [
+            name for name, (entity_kind, pattern, _, _) in INTENTS.items()
+            if entity_kind == kind and re.search(pattern, rest)
+        ]
+        if len(candidates) != 1:
+            self.unmatched += 1
+            return None
+
+        _, _, cypher, render = INTENTS[candidates[0]]
+        self.matched += 1
+        return IntentMatch(candidates[0], entity, cypher, render)
+
+    def stats(self):
+        return {
+            "indexed_people": len(self.index.people),
+            "indexed_projects": len(self.index.projects),
+            "matched": self.matched,
+            "unmatched": self.unmatched,
+        }
@@ -0,0 +1,80 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class Job:
+    def __init__(self, kind: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "pending"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def update(self, **progress):
+        self.progress.update(progress)
+
+    def as_dict(self):
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "elapsed_seconds": elapsed,
+        }
+
+
+class JobRegistry:
+    """Runs long admin operations on background threads and keeps the most
+    recent ``max_jobs`` of them for status polling."""
+
+    def __init__(self, max_jobs: int = 100) -> None:
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def _running(self, kind: str):
+        for job in self._jobs.values():
+            if job.kind == kind and job.status in ("pending", "running"):
+                return job
+        return None
+
+    def start(self, kind: str, fn) -> Job:
+        """Starts ``fn(job)`` in the background unless a job of the same kind
+        is already running, in which case that job is returned."""
+        with self._lock:
+            job = self._running(kind)
+            if job is not None:
+                return job
+            job = Job(kind)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+        thread = threading.Thread(
+            target=self._run, args=(job, fn), name=f"job-{kind}", daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job: Job, fn):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
@@ -0,0 +1,243 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+ROW_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets, labelnames=()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total))
+                           for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                yield self.name + "_bucket", _format_labels(
+                    self.labelnames, key, [("le", le)]), cumulative
+            yield self.name + "_sum", _format_labels(self.labelnames, key), total
+            yield self.name + "_count", _format_labels(self.labelnames, key), cumulative
+
+
+class FunctionMetric:
+    """Reads its value from ``fn`` at scrape time, e.g. a cache hit count.
+    Counter names end in ``_total``, as their sample does."""
+
+    def __init__(self, name: str, documentation: str, fn, kind: str = "gauge") -> None:
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        yield self.name, "", self.fn()
+
+
+class MetricsRegistry:
+    """Minimal Prometheus text-format registry (exposition format 0.0.4)."""
+
+    def __init__(self) -> None:
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """Collects prompt/completion token counts reported by the provider.
+
+    OpenAI chat models report ``usage_metadata`` on the message (and
+    ``token_usage`` in ``llm_output``); Ollama reports ``prompt_eval_count``
+    and ``eval_count`` in the generation info.
+    """
+
+    def __init__(self) -> None:
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                info = generation.generation_info or {}
+                if usage:
+                    self.prompt_tokens += usage.get("input_tokens", 0)
+                    self.completion_tokens += usage.get("output_tokens", 0)
+                    return
+                if "prompt_eval_count" in info or "eval_count" in info:
+                    self.prompt_tokens += info.get("prompt_eval_count") or 0
+                    self.completion_tokens += info.get("eval_count") or 0
+                    return
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        self.prompt_tokens += usage.get("prompt_tokens", 0)
+        self.completion_tokens += usage.get("completion_tokens", 0)
+
+
+class RequestTrace:
+    """Per-request record of stage timings, token counts, rows and Cypher."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.tokens = {}
+        self.rows = None
+        self.cypher = None
+        self.time_to_first_token = None
+        self.context = None
+        self.schema = None
+        self.entities = None
+        self.coalesced = False
+
+    def follow(self, leader: "RequestTrace"):
+        """Copies what ``leader`` recorded into this trace, for a request
+        that waited on an identical in-flight request instead of running
+        the pipeline itself. Its own total time is kept."""
+        self.coalesced = True
+        self.stages = dict(leader.stages)
+        self.tokens = dict(leader.tokens)
+        self.rows = leader.rows
+        self.cypher = leader.cypher
+        self.context = leader.context
+        self.schema = leader.schema
+        self.entities = leader.entities
+        if self.time_to_first_token is None:
+            self.time_to_first_token = self.elapsed()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    @contextmanager
+    def llm_stage(self, name: str):
+        """Times ``name`` and yields a callback list that records its token
+        usage; pass it as ``config={"callbacks": callbacks}``."""
+        usage = TokenUsageCallback()
+        with self.stage(name):
+            yield [usage]
+        self.tokens[name] = {"prompt": usage.prompt_tokens,
+                             "completion": usage.completion_tokens}
+
+    def mark_first_token(self):
+        if self.time_to_first_token is None:
+            self.time_to_first_token = self.elapsed()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            "total_seconds": self.elapsed(),
+            "time_to_first_token_seconds": self.time_to_first_token,
+            "stages": dict(self.stages),
+            "tokens": dict(self.tokens),
+            "rows": self.rows,
+            "cypher": self.cypher,
+            "context": self.context,
+            "schema": self.schema,
+            "entities": self.entities,
+            "coalesced": self.coalesced,
+        }
+
+
+class PipelineMetrics:
+    def __init__(self) -> None:
+        self.registry = MetricsRegistry()
+        self.requests = self.registry.register(Histogram(
+            "qa_request_seconds", "End-to-end latency of QA requests.",
+            LATENCY_BUCKETS, ("endpoint", "path")))
+        self.first_token = self.registry.register(Histogram(
+            "qa_time_to_first_token_seconds", "Latency until the first answer text is produced.",
+            LATENCY_BUCKETS, ("endpoint", "path")))
+        self.stages = self.registry.register(Histogram(
+            "qa_stage_seconds", "Latency of each QA pipeline stage.",
+            LATENCY_BUCKETS, ("stage",)))
+        self.tokens = self.registry.register(Histogram(
+            "qa_llm_tokens", "Tokens per LLM call by stage and kind.",
+            TOKEN_BUCKETS, ("stage", "kind")))
+        self.rows = self.registry.register(Histogram(
+            "qa_result_rows", "Rows returned by the executed Cypher query.", ROW_BUCKETS))
+        self.schema_tokens = self.registry.register(Histogram(
+            "qa_schema_tokens", "Estimated tokens of the schema in the Cypher prompt before and after pruning.",
+            TOKEN_BUCKETS, ("kind",)))
+        self.context_tokens = self.registry.register(Histogram(
+            "qa_context_tokens", "Estimated tokens of query results before and after compaction.",
+            TOKEN_BUCKETS, ("kind",)))
+
+    def register_function(self, name: str, documentation: str, fn, kind: str = "gauge"):
+        self.registry.register(FunctionMetric(name, documentation, fn, kind))
+
+    def observe(self, trace: RequestTrace, endpoint: str, path: str):
+        self.requests.observe(trace.elapsed(), endpoint=endpoint, path=path)
+        if trace.time_to_first_token is not None:
+            self.first_token.observe(trace.time_to_first_token, endpoint=endpoint, path=path)
+        if trace.coalesced:
+            # The stages ran once, in the leader, and were recorded there.
+            return
+        for stage, seconds in trace.stages.items():
+            self.stages.observe(seconds, stage=stage)
+        for stage, usage in trace.tokens.items():
+            for kind, count in usage.items():
+                self.tokens.observe(count, stage=stage, kind=kind)
+        if trace.rows is not None:
+            self.rows.observe(trace.rows)
+        if trace.schema is not None:
+            self.schema_tokens.observe(trace.schema["full_tokens"], kind="full")
+            self.schema_tokens.observe(trace.schema["pruned_tokens"], kind="pruned")
+        if trace.context is not None:
+            self.context_tokens.observe(trace.context["raw_tokens"], kind="raw")
+            self.context_tokens.observe(trace.context["compact_tokens"], kind="compact")
+
+    def render(self) -> str:
+        return self.registry.render()
@@ -1,55 +1,159 @@
+import hashlib
+import threading
+import time
+
 from langchain_community.graphs import Neo4jGraph
 
+from .ingest import BulkIngest
+from .pruning import format_schema
+
+# Bookkeeping properties that are kept out of the schema shown to the LLM.
+INTERNAL_PROPERTIES = {"row_hash"}
+
 
 class Neo4j:
-    def __init__(self, url: str, username: str, password: str) -> None:
+    # Process-wide counters so it is visible when drivers or schema
+    # introspections are created more often than expected.
+    driver_creations = 0
+    schema_refreshes = 0
+
+    def __init__(self, url: str, username: str, password: str,
+                 schema_ttl: float = None, max_connection_pool_size: int = None,
+                 graphDB=None) -> None:
         self.url = url
         self.username = username
         self.password = password
-        self.graphDB = Neo4jGraph(
-            url=url, username=username, password=password)
+        self.schema_ttl = schema_ttl
+        self.schema_version = 0
+        self.schema_hash = ""
+        self.schema_refreshed_at = None
+        # Bumped whenever the data changes so answer caches can tell that
+        # what they hold is stale.
+        self.graph_version = 0
+        self._schema_lock = threading.Lock()
+
+        if graphDB is None:
+            driver_config = {}
+            if max_connection_pool_size:
+                driver_config["max_connection_pool_size"] = max_connection_pool_size
+            graphDB = Neo4jGraph(
+                url=url, username=username, password=password,
+                refresh_schema=False, driver_config=driver_config)
+            Neo4j.driver_creations += 1
+        self.graphDB = graphDB
+
+        self.refresh_schema()
 
     def get_graph(self):
+        if self.schema_expired():
+            self.refresh_schema()
         return self.graphDB
 
-    def delete_data_hr(self):
-        query = """
-        MATCH (n)
-        OPTIONAL MATCH (n)-[r]-()
-        DELETE n,r
-        """
-        self.graphDB.query(query)
-        self.graphDB.refresh_schema()
-        return {"result": self.graphDB.schema}
-
-    def populate_data_hr(self):
-        query = """
-        LOAD CSV WITH HEADERS FROM 'https://chm-ahgd001-dev-data-storage-assets.s3.ap-southeast-1.amazonaws.com/assets/product_urls/data.csv' AS row
-        MERGE (p:Person {id: row.id, full_name: row.full_name})
-        SET p.position = row.position,
-            p.department = row.department,
-            p.career_mentor = row.career_mentor,
-            p.tech_mentor = row.tech_mentor,
-            p.project = row.project
-
-        WITH p, row
-        WHERE row.career_mentor IS NOT NULL AND trim(row.career_mentor) <> p.full_name
-        MERGE (c:Person {full_name: trim(row.career_mentor)})
-        MERGE (c)-[:IS_CAREER_MENTOR_OF]->(p)
-        MERGE (p)-[:IS_CAREER_MENTEE_OF]->(c)
-        WITH p, row
-        WHERE row.tech_mentor IS NOT NULL
-        MERGE (t:Person {full_name: trim(row.tech_mentor)})
-        MERGE (t)-[:IS_TECH_MENTOR_OF]->(p)
-        MERGE (p)-[:IS_TECH_MENTEE_OF]->(t)
-        WITH p, row
-        WHERE row.project IS NOT NULL AND row.project <> 'None'
-        WITH p, replace(replace(replace(row.project, "[", ""), "]", ""), "'", "") AS cleaned_projects
-        WITH p, split(cleaned_projects, ', ') AS projects
-        UNWIND projects AS project_name
-        MERGE (proj:Project {name: trim(project_name)})
-        MERGE (p)-[:WORKS_ON]->(proj)
-        """
-        self.graphDB.query(query)
-        self.graphDB.refresh_schema()
-        return {"result": self.graphDB.schema}
+    def get_schema(self) -> str:
+        return self.get_graph().schema
+
+    def schema_expired(self) -> bool:
+        if not self.schema_ttl or self.schema_refreshed_at is None:
+            return False
+        return time.monotonic() - self.schema_refreshed_at > self.schema_ttl
+
+    def refresh_schema(self) -> str:
+        with self._schema_lock:
+            self.graphDB.refresh_schema()
+            self.hide_internal_properties()
+            self.schema_version += 1
+            self.schema_hash = hashlib.sha1(
+                self.graphDB.schema.encode("utf-8")).hexdigest()
+            self.schema_refreshed_at = time.monotonic()
+            Neo4j.schema_refreshes += 1
+        return self.graphDB.schema
+
+    def hide_internal_properties(self):
+        structured = self.graphDB.structured_schema
+        node_props = structured.get("node_props", {})
+        if not any(prop["property"] in INTERNAL_PROPERTIES
+                   for props in node_props.values() for prop in props):
+            return
+        structured["node_props"] = {
+            label: [prop for prop in props if prop["property"] not in INTERNAL_PROPERTIES]
+            for label, props in node_props.items()}
+        self.graphDB.schema = format_schema(
+            structured["node_props"], structured.get("rel_props", {}),
+            structured.get("relationships", []))
+
+    def close(self):
+        self.graphDB._driver.close()
+
+    def stats(self):
+        return {
+            "driver_creations": Neo4j.driver_creations,
+            "schema_refreshes": Neo4j.schema_refreshes,
+            "schema_version": self.schema_version,
+            "schema_hash": self.schema_hash,
+            "schema_ttl": self.schema_ttl,
+            "graph_version": self.graph_version,
+        }
+
+    def delete_data_hr(self, batch_size: int = 10000, progress=None):
+        # Relationships go first so each node batch is a cheap DETACH DELETE;
+        # every batch is its own transaction to keep transaction state bounded.
+        phases = [
+            ("relationships", "MATCH ()-[r]->() WITH r LIMIT $limit DELETE r"),
+            ("nodes", "MATCH (n) WITH n LIMIT $limit DETACH DELETE n"),
+        ]
+        nodes_deleted = 0
+        relationships_deleted = 0
+        batches = 0
+        started = time.perf_counter()
+        for phase, query in phases:
+            while True:
+                counters = self.write(query, {"limit": batch_size})
+                nodes_deleted += counters.nodes_deleted
+                relationships_deleted += counters.relationships_deleted
+                batches += 1
+                if progress is not None:
+                    elapsed = time.perf_counter() - started
+                    progress(
+                        phase=phase,
+                        batches=batches,
+                        nodes_deleted=nodes_deleted,
+                        relationships_deleted=relationships_deleted,
+                        deleted_per_sec=(nodes_deleted + relationships_deleted) / elapsed
+                        if elapsed else 0.0)
+                if counters.nodes_deleted + counters.relationships_deleted == 0:
+                    break
+
+        self.graph_version += 1
+        self.refresh_schema()
+        return {"result": self.graphDB.schema,
+                "delete": {"nodes_deleted": nodes_deleted,
+                           "relationships_deleted": relationships_deleted,
+                           "batches": batches,
+                           "seconds": time.perf_counter() - started}}
+
+    def write(self, query: str, params: dict = None):
+        # Explicit write transaction so the driver retries transient
+        # failures (e.g. deadlocks between concurrent ingest batches).
+        with self.graphDB._driver.session(database=self.graphDB._database) as session:
+            return session.execute_write(
+                lambda tx: tx.run(query, params or {}).consume().counters)
+
+    def populate_data_hr(self, path: str = None, batch_size: int = 5000, workers: int = 4,
+                         model: str = "full"):
+        ingest = BulkIngest(self, batch_size=batch_size, workers=workers, model=model)
+        stats = ingest.run_file(path)
+        self.graph_version += 1
+        self.refresh_schema()
+        return {"result": self.graphDB.schema, "ingest": stats}
+
+    def sync_data_hr(self, path: str = None, batch_size: int = 5000, workers: int = 4,
+                     model: str = "full"):
+        """Delta version of ``populate_data_hr``: only rows that changed since
+        the last load are written, and the graph version and schema are only
+        refreshed when something did."""
+        ingest = BulkIngest(self, batch_size=batch_size, workers=workers, model=model)
+        stats = ingest.run_delta_file(path)
+        if stats["changed"]:
+            self.graph_version += 1
+            self.refresh_schema()
+        return {"result": self.graphDB.schema, "ingest": stats}
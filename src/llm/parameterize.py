@@ -0,0 +1,157 @@
+import re
+import threading
+
+from .cache import LRUCache
+
+WORD_PATTERN = re.compile(r"\$?\w+")
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+PARAMETER_PATTERN = re.compile(r"\$(\w+)")
+# LIMIT and SKIP take only integer parameters.
+ROW_COUNT_CONTEXT = re.compile(r"\b(?:LIMIT|SKIP)\s*$", re.IGNORECASE)
+# What precedes a literal decides the parameter name: a map key
+# ({full_name: 'X'}) or a compared property (p.department = 'X').
+KEY_CONTEXT = re.compile(r"(\w+)\s*:\s*$")
+PROPERTY_CONTEXT = re.compile(
+    r"\w+\.(\w+)\s*(?:=|<>|<=|>=|<|>|\bCONTAINS|\bSTARTS\s+WITH|\bENDS\s+WITH|\bIN)\s*$",
+    re.IGNORECASE)
+
+
+def _read_string(cypher: str, start: int):
+    quote = cypher[start]
+    chars = []
+    i = start + 1
+    while i < len(cypher):
+        char = cypher[i]
+        if char == "\\" and i + 1 < len(cypher):
+            escaped = cypher[i + 1]
+            chars.append({"n": "\n", "t": "\t"}.get(escaped, escaped))
+            i += 2
+            continue
+        if char == quote:
+            return "".join(chars), i + 1
+        chars.append(char)
+        i += 1
+    return None, len(cypher)
+
+
+def parameterize(cypher: str, params: dict = None):
+    """Lifts string and number literals out of ``cypher`` into parameters.
+
+    Returns (template, params, lifted). Queries that differ only in the
+    names or numbers they mention share a template, so Neo4j can reuse one
+    cached plan. Literals in variable-length bounds (``*1..3``) and
+    non-integer LIMIT/SKIP counts, which cannot be parameters, and text in
+    comments or backticks are left alone.
+    """
+    params = dict(params or {})
+    used = set(params) | set(PARAMETER_PATTERN.findall(cypher))
+    out = []
+    lifted = 0
+    i = 0
+    in_brackets = False
+    variable_length = False
+
+    def name_for(prefix: str) -> str:
+        match = KEY_CONTEXT.search(prefix) or PROPERTY_CONTEXT.search(prefix)
+        base = match.group(1) if match else "p"
+        name = base if match else f"{base}{len(used)}"
+        suffix = 2
+        while name in used:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        used.add(name)
+        return name
+
+    while i < len(cypher):
+        char = cypher[i]
+        if char in "'\"":
+            value, end = _read_string(cypher, i)
+            if value is None:
+                out.append(cypher[i:])
+                break
+            name = name_for("".join(out))
+            params[name] = value
+            out.append("$" + name)
+            lifted += 1
+            i = end
+        elif char == "`":
+            end = cypher.find("`", i + 1)
+            end = len(cypher) if end == -1 else end + 1
+            out.append(cypher[i:end])
+            i = end
+        elif cypher.startswith("//", i):
+            end = cypher.find("\n", i)
+            end = len(cypher) if end == -1 else end
+            out.append(cypher[i:end])
+            i = end
+        elif char == "$" or char.isalpha() or char == "_":
+            match = WORD_PATTERN.match(cypher, i)
+            out.append(match.group(0))
+            i = match.end()
+        elif char.isdigit():
+            match = NUMBER_PATTERN.match(cypher, i)
+            text = match.group(0)
+            if (variable_length or cypher.startswith("..", match.end()) or out and out[-1].endswith("..")
+                    or not text.isdigit() and ROW_COUNT_CONTEXT.search("".join(out))):
+                out.append(text)
+            else:
+                name = name_for("".join(out))
+                params[name] = float(text) if any(c in text for c in ".eE") else int(text)
+                out.append("$" + name)
+                lifted += 1
+            i = match.end()
+        else:
+            if char == "[":
+                in_brackets, variable_length = True, False
+            elif char == "]":
+                in_brackets, variable_length = False, False
+            elif char == "*" and in_brackets:
+                variable_length = True
+            out.append(char)
+            i += 1
+    return "".join(out), params, lifted
+
+
+class QueryTemplates:
+    """Counts the distinct query templates sent to Neo4j.
+
+    Neo4j caches plans by query text (``server.db.query_cache_size``,
+    1000 by default). The driver cannot read that cache, so its hit ratio is
+    estimated with an LRU of the same size, both for the templates actually
+    sent and for the raw texts that would have been sent without
+    parameterization.
+    """
+
+    def __init__(self, plan_cache_size: int = 1000, max_tracked: int = 10000) -> None:
+        self.plan_cache = LRUCache(max_size=plan_cache_size)
+        self.raw_plan_cache = LRUCache(max_size=plan_cache_size)
+        self.max_tracked = max_tracked
+        self.counts = {}
+        self.queries = 0
+        self.literals_lifted = 0
+        self._lock = threading.Lock()
+
+    def record(self, raw: str, template: str, lifted: int):
+        for cache, text in ((self.plan_cache, template), (self.raw_plan_cache, raw)):
+            if cache.get(text) is None:
+                cache.set(text, True)
+        with self._lock:
+            self.queries += 1
+            self.literals_lifted += lifted
+            if template in self.counts or len(self.counts) < self.max_tracked:
+                self.counts[template] = self.counts.get(template, 0) + 1
+
+    def common(self, limit: int = 10):
+        with self._lock:
+            return sorted(self.counts.items(), key=lambda item: -item[1])[:limit]
+
+    def stats(self):
+        return {
+            "queries": self.queries,
+            "templates": len(self.counts),
+            "literals_lifted": self.literals_lifted,
+            "estimated_plan_cache": self.plan_cache.stats(),
+            "estimated_plan_cache_without_parameters": self.raw_plan_cache.stats(),
+            "common": [{"template": template, "count": count}
+                       for template, count in self.common()],
+        }
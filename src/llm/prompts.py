@@ -0,0 +1,118 @@
+from langchain_core.prompts import ChatPromptTemplate
+from langchain.prompts import PromptTemplate
+
+CYPHER_GENERATION_TEMPLATE = """
+        <Task>
+        Generate Cypher query for a Neo4j graph database.
+        </Task>
+        <Instructions>
+        Use only the provided relationship types and properties in the schema.
+        Do not use any other relationship types or properties that are not provided.
+        </Instructions>
+        <Schema>
+        {schema}
+        </Schema>
+        <Note>
+        Do not include any explanations or apologies in your responses.
+        Do not respond to any questions that might ask anything other than
+        for you to construct a Cypher statement. Do not include any text except
+        the generated Cypher statement. Make sure the direction of the relationship is
+        correct in your queries. Make sure you alias both entities and relationships
+        properly. Do not run any queries that would add to or delete from
+        the database. Make sure to alias all statements that follow as with
+        statement (e.g. WITH c as customer, o.orderID as order_id).
+        If you need to divide numbers, make sure to
+        filter the denominator to be non-zero.
+        Always return full_name, plus any other property the question asks about.
+        </Note>
+        <Examples>
+        {mentor_examples}
+        # Find the project and people who works on a project
+        Use the relationship WORKS_ON and return all information including project name
+        # Find everyone under a person
+        Use a variable-length IS_CAREER_MENTOR_OF path from the person, e.g. -[:IS_CAREER_MENTOR_OF*1..]->
+        String category values:
+        Use existing strings and values from the schema provided. 
+        </Examples>
+        <Question>
+        {question}
+        </Question>
+        """
+
+QA_GENERATION_TEMPLATE = """
+        <Task>
+        You are an assistant that takes the results from a Neo4j Cypher query and forms a human-readable response. The query results section contains the results of a Cypher query that was generated based on a user's natural language question. The provided information is authoritative; you must never question it or use your internal knowledge to alter it. Make the answer sound like a response to the question.
+        Always assume the query results is the answer to your question.
+        </Task>
+        <Query Results>
+        {context}
+        </Query Results>
+        <Question>
+        {question}
+        </Question>
+        <Note>
+        If the provided information is empty, respond by stating that you don't know the answer. Empty information is indicated by: []. If there is a cypher context provided, answer using the context.
+        The query results are a table: a header line of column names separated by |, then one line per row. Lines of the form "column: value" above the header apply to every row, multiple values in a cell are separated by ;, and a final "... more rows not shown" line summarises rows that were left out.
+        When names are provided in the query results, such as hospital names, be cautious of any names containing commas or other punctuation. For example, 'Jones, Brown and Murray' is a single hospital name, not multiple hospitals. Ensure that any list of names is presented clearly to avoid ambiguity and make the full names easily identifiable.
+        Never state that you lack sufficient information if data is present in the query results. Always utilize the data provided.
+        Only output relevant information and only use purely text in output formatting. Do not use newline. Just answer the question, do not write any irrelevant sentences. Do not include the question in the output.
+        </Note>
+        <Format>
+        Question: Find is_tech_mentor_of William Hoover
+        Answer: Bryan Wheeler is the tech mentor of William Hoover
+        Question: Find is_tech_mentee_of Scott Stafford
+        Answer: Tech mentee of Scott Stafford are: Bryan Wheeler, Kristin Johnson, Jeffery Dominguez
+        Question: Find all person who works on Market Research Tool
+        Answer: Employees who worked on Market Research Tool are: Bryan Wheeler, Kristin Johnson, Jeffery Dominguez
+        Question: Find project of Bryan Wheeler
+        Answer: Bryan Wheeler worked on Market Research Tool, and Digital Payment Integration
+        </Format>
+        """
+
+REPHRASE_TEMPLATE = """
+        <Note>
+        Rephrase the question to one of the following and replace the name with the provided name in the context:
+        Find career mentor of <name>
+        Find tech mentor of <name>
+        Find career mentee of <name>
+        Find tech mentee of <name>
+        Find the department of <name>
+        Find the id of <name>
+        Find the full_name of <name>
+        Find the position of <name>
+        Find all person who works_on <project>
+        Find everyone under <name>
+        Find project of <name>
+        </Note>
+        <Question>
+        {question}
+        </Question>
+        <Output format>
+        Do not include any unnecessary sentences. Just output the rephrased question
+        </Output format>
+        """
+
+# Mentorship examples for each graph model (see ingest.GRAPH_MODELS). The
+# compact model only has mentor -> mentee edges.
+MENTOR_EXAMPLES = {
+    "full": """# Find the mentor of a person
+        Use the relationship IS_CAREER_MENTEE_OF or IS_TECH_MENTOR_OF and return all information
+        # Find the mentees of a person
+        Use the relationship IS_CAREER_MENTOR_OF or IS_TECH_MENTEE_OF and return all information""",
+    "compact": """# Find the mentor of a person
+        The mentor is the start of IS_CAREER_MENTOR_OF or IS_TECH_MENTOR_OF, e.g. (m:Person)-[:IS_TECH_MENTOR_OF]->(p:Person {full_name: 'name'})
+        # Find the mentees of a person
+        The mentees are the end of IS_CAREER_MENTOR_OF or IS_TECH_MENTOR_OF, e.g. (p:Person {full_name: 'name'})-[:IS_TECH_MENTOR_OF]->(m:Person)""",
+}
+
+# Built once at import; every request and model shares them.
+CYPHER_GENERATION_PROMPTS = {
+    graph_model: PromptTemplate(
+        input_variables=["schema", "question"], template=CYPHER_GENERATION_TEMPLATE,
+        partial_variables={"mentor_examples": examples})
+    for graph_model, examples in MENTOR_EXAMPLES.items()
+}
+QA_GENERATION_PROMPT = PromptTemplate(
+    input_variables=["context", "question"], template=QA_GENERATION_TEMPLATE
+)
+REPHRASE_PROMPT = ChatPromptTemplate.from_template(REPHRASE_TEMPLATE)
@@ -0,0 +1,96 @@
+import re
+
+from .compact import requested_properties
+from .intents import normalize_name
+
+STOPWORDS = {"is", "of", "on", "has", "have", "the", "a", "an", "to", "in", "by", "for"}
+# Mentor and mentee relationships answer each other's questions (by
+# reversing the direction), so they share a keyword.
+# The reporting line is the career mentorship hierarchy.
+SYNONYMS = {"mentee": "mentor", "people": "person", "employee": "person",
+            "who": "person", "working": "work", "worked": "work",
+            "report": "career", "reporting": "career", "under": "career",
+            "below": "career", "manager": "career", "boss": "career"}
+# EntityIndex kinds -> node labels.
+ENTITY_LABELS = {"person": "Person", "project": "Project"}
+
+
+def words(text: str):
+    result = set()
+    for word in re.split(r"[^a-z0-9]+", re.sub(r"([a-z])([A-Z])", r"\1 \2", text).lower()):
+        if not word or word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s"):
+            word = word[:-1]
+        result.add(SYNONYMS.get(word, word))
+    return result
+
+
+def _format_props(props) -> str:
+    return ", ".join(f"{prop['property']}: {prop['type']}" for prop in props)
+
+
+def format_schema(node_props, rel_props, relationships) -> str:
+    """Same layout as ``Neo4jGraph.schema``."""
+    return "\n".join([
+        "Node properties:",
+        "\n".join(f"{label} {{{_format_props(props)}}}" for label, props in node_props.items()),
+        "Relationship properties:",
+        "\n".join(f"{rel_type} {{{_format_props(props)}}}"
+                  for rel_type, props in rel_props.items()),
+        "The relationships:",
+        "\n".join(f"(:{rel['start']})-[:{rel['type']}]->(:{rel['end']})"
+                  for rel in relationships),
+    ])
+
+
+class SchemaPruner:
+    """Cuts the schema in the Cypher prompt down to what a question needs.
+
+    Relationship types are scored by the question words they share with
+    their name (and their end label when it differs from the start), and
+    only the best-scoring ones are kept. Labels are kept when they are an
+    endpoint of a kept relationship, are named in the question, or are the
+    label of an entity found in it, or have a property the question asks
+    about; they keep all their properties. When no relationship matches,
+    all of them are kept, and when no label matches either, the full schema
+    is used.
+    """
+
+    def __init__(self, structured_schema: dict) -> None:
+        self.node_props = structured_schema.get("node_props", {})
+        self.rel_props = structured_schema.get("rel_props", {})
+        self.relationships = structured_schema.get("relationships", [])
+        self.relationship_words = [
+            words(rel["type"]) | (words(rel["end"]) if rel["end"] != rel["start"] else set())
+            for rel in self.relationships]
+
+    def prune(self, question: str, entity_kinds=()):
+        """Returns the pruned schema string, or None to use the full one."""
+        question_words = words(normalize_name(question))
+        scores = [len(rel_words & question_words) for rel_words in self.relationship_words]
+        best = max(scores, default=0)
+        # A question may need a relationship none of its words name
+        # ("colleagues"), and the prompt only allows the listed ones.
+        relationships = [rel for rel, score in zip(self.relationships, scores)
+                         if not best or score == best]
+
+        requested = requested_properties(question) | {
+            prop["property"] for props in self.node_props.values() for prop in props
+            if words(prop["property"]) <= question_words}
+        labels = {rel[end] for rel in relationships for end in ("start", "end")}
+        labels |= {ENTITY_LABELS[kind] for kind in entity_kinds if kind in ENTITY_LABELS}
+        labels |= {label for label, props in self.node_props.items()
+                   if words(label) <= question_words
+                   or any(prop["property"] in requested for prop in props)}
+        if not labels:
+            return None
+
+        # Every property of a kept label stays: a question filtering on a
+        # value ("Who works in Engineering?") names no property.
+        node_props = {label: props for label, props in self.node_props.items()
+                      if label in labels}
+        rel_types = {rel["type"] for rel in relationships}
+        rel_props = {rel_type: props for rel_type, props in self.rel_props.items()
+                     if rel_type in rel_types}
+        return format_schema(node_props, rel_props, relationships)
@@ -1,32 +1,152 @@
-from fastapi import APIRouter, Query
-from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import Annotated, List
+from .batch import answer_batch, stream_batch
+from .metrics import RequestTrace
 from .schemas import Question
 from .service import Service
 
 import json
+import os
 
 llm_router = APIRouter()
 
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 1000))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+
+
+def get_service(request: Request) -> Service:
+    return request.app.state.service
+
+
+ServiceDep = Annotated[Service, Depends(get_service)]
+
 
 @llm_router.post("/generate_response")
-async def generate_response(question: Annotated[Question, Query()] = None):
-    response = Service().generate_response(question)
-    return {"response": response}
+async def generate_response(service: ServiceDep, question: Annotated[Question, Query()] = None):
+    trace = RequestTrace()
+    response = await service.limiter.run(service.generate_response, question, trace)
+    body = {"response": response["result"], "path": response["path"]}
+    if question.timings:
+        body["timings"] = trace.as_dict()
+    return body
+
+
+def server_sent_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class SlotStreamingResponse(StreamingResponse):
+    """Releases a limiter slot taken for the stream once the response is
+    over, including when the client disconnected before the body started
+    and the body generator never ran."""
+
+    def __init__(self, content, release, **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+@llm_router.post("/generate_response/stream")
+async def generate_response_stream(service: ServiceDep, question: Annotated[Question, Query()] = None):
+    # Take the slot before responding so an overloaded server still answers
+    # with 429/503 instead of an event stream that fails immediately.
+    await service.limiter.acquire()
+    trace = RequestTrace()
+    events = service.stream_response(question, trace)
+
+    async def body():
+        try:
+            async for event, data in service.limiter.iterate(events):
+                yield server_sent_event(event, data)
+            if question.timings:
+                yield server_sent_event("timings", trace.as_dict())
+        except Exception as e:
+            yield server_sent_event("error", {"detail": str(e)})
+        finally:
+            try:
+                events.close()
+            except ValueError:
+                # Still running on the pool after a client disconnect; it
+                # finishes on its own.
+                pass
+
+    return SlotStreamingResponse(body(), service.limiter.release,
+                                 media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+
+
+def check_batch_size(questions: List[Question]):
+    if len(questions) > BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413, detail=f"At most {BATCH_MAX_SIZE} questions per batch")
+
+
+@llm_router.post("/generate_responses")
+async def generate_responses(service: ServiceDep, questions: List[Question]):
+    check_batch_size(questions)
+    items = await answer_batch(service, questions, BATCH_CONCURRENCY)
+    return {"responses": items}
+
+
+@llm_router.post("/generate_responses/stream")
+async def generate_responses_stream(service: ServiceDep, questions: List[Question]):
+    check_batch_size(questions)
+
+    async def lines():
+        async for item in stream_batch(service, questions, BATCH_CONCURRENCY):
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @llm_router.post("/rephrase_prompt")
-async def rephrase_prompt(question: Annotated[Question, Query()] = None):
-    response = Service().rephrase_prompt(question)
-    return {"response": response}
+async def rephrase_prompt(service: ServiceDep, question: Annotated[Question, Query()] = None):
+    trace = RequestTrace()
+    response = await service.limiter.run(service.rephrase_prompt, question, trace)
+    body = {"response": response}
+    if question.timings:
+        body["timings"] = trace.as_dict()
+    return body
 
 
 @llm_router.get("/populate_data")
-async def populate_data():
-    response = Service().populate_data()
+def populate_data(service: ServiceDep, full: bool = False):
+    response = service.populate_data(full=full)
     return {"response": response}
 
 
 @llm_router.get("/delete_data")
-async def delete_data():
-    response = Service().delete_data()
+def delete_data(service: ServiceDep):
+    response = service.start_delete_job()
     return {"response": response}
+
+
+@llm_router.get("/delete_data/{job_id}")
+def delete_data_status(service: ServiceDep, job_id: str):
+    response = service.get_job(job_id)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return {"response": response}
+
+
+@llm_router.get("/refresh_schema")
+def refresh_schema(service: ServiceDep):
+    response = service.refresh_schema()
+    return {"response": response}
+
+
+@llm_router.get("/stats")
+async def stats(service: ServiceDep):
+    return {"response": service.stats()}
+
+
+@llm_router.get("/metrics", response_class=PlainTextResponse)
+def metrics(service: ServiceDep):
+    return PlainTextResponse(service.metrics.render(),
+                             media_type="text/plain; version=0.0.4")
@@ -7,8 +7,22 @@ class ModelEnum(str, Enum):
     openai = "openai"
 
 
+class AnswerModeEnum(str, Enum):
+    auto = "auto"
+    template = "template"
+    llm = "llm"
+
+
 class Question(BaseModel):
     question: str = Field(
         title="question", description="Question sent to the model.")
     model: ModelEnum = Field(
         title="model", description="Model to use.")
+    timings: bool = Field(
+        default=False, title="timings",
+        description="Include per-stage timings, token counts and the executed Cypher in the response.")
+    answer_mode: AnswerModeEnum = Field(
+        default=AnswerModeEnum.auto, title="answer_mode",
+        description="auto: write the answer from a template when the result shape is recognised, "
+                    "otherwise with the QA model; template: never call the QA model; "
+                    "llm: always use the LLM chain.")
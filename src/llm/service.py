@@ -1,168 +1,573 @@
-from langchain.chains import GraphCypherQAChain
-from langchain_core.prompts import ChatPromptTemplate
-from langchain.prompts import PromptTemplate
-from langchain_ollama.llms import OllamaLLM
-from langchain_openai import ChatOpenAI
-from .schemas import Question
+from langchain_community.chains.graph_qa.cypher_utils import CypherQueryCorrector
+from langchain_community.chains.graph_qa.cypher_utils import Schema as CypherSchema
+from langchain_core.callbacks import StdOutCallbackHandler
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.utils.input import print_text
+from .schemas import AnswerModeEnum, Question
 from .neo4j import Neo4j
+from .concurrency import ConcurrencyLimiter
+from .answers import AnswerRenderer
+from .compact import ContextCompactor, estimate_tokens
+from .cache import CypherCache, LRUCache, SingleFlight, normalize_question
+from .fuzzy import EntityResolver, FuzzyNameIndex
+from .intents import INTENTS, EntityIndex, IntentRouter, normalize_name
+from .jobs import JobRegistry
+from .metrics import PipelineMetrics, RequestTrace
+from .prompts import CYPHER_GENERATION_PROMPTS, QA_GENERATION_PROMPT, REPHRASE_PROMPT
+from .parameterize import QueryTemplates, parameterize
+from .pruning import SchemaPruner
+from .snapshot import GraphSnapshot
 
-from dotenv import load_dotenv
-
+import logging
 import os
+import re
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 100
+
+
+def env_float(name: str, default: float = None):
+    value = os.getenv(name)
+    return float(value) if value else default
+
 
-load_dotenv()
+def env_int(name: str, default: int = None):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def extract_cypher(text: str) -> str:
+    # Same as langchain_community's extract_cypher, whose module imports all
+    # of langchain.chains.
+    matches = re.findall(r"```(.*?)```", text, re.DOTALL)
+    return matches[0] if matches else text
+
+
+def ollama_keep_alive():
+    # Ollama takes a duration ("30m") or seconds (-1 keeps the model loaded).
+    value = os.getenv("OLLAMA_KEEP_ALIVE")
+    if value and value.lstrip("-").isdigit():
+        return int(value)
+    return value or None
 
 
 class Service:
-    def __init__(self) -> None:
-        self.graphDB_instance = Neo4j(url=os.getenv("NEO4J_URI"), username=os.getenv(
-            "NEO4J_USERNAME"), password=os.getenv("NEO4J_PASSWORD"))
+    def __init__(self, graphDB_instance: Neo4j = None, model_factory=None) -> None:
+        # Both can be replaced with stand-ins (see src/bench) to run the
+        # pipeline without a live Neo4j or LLM provider.
+        self.graphDB_instance = graphDB_instance or Neo4j(url=os.getenv("NEO4J_URI"), username=os.getenv(
+            "NEO4J_USERNAME"), password=os.getenv("NEO4J_PASSWORD"),
+            schema_ttl=env_float("NEO4J_SCHEMA_TTL"),
+            max_connection_pool_size=env_int("NEO4J_MAX_POOL_SIZE"))
+        self.model_factory = model_factory
+        # "full" or "compact", see ingest.GRAPH_MODELS.
+        self.graph_model = os.getenv("GRAPH_MODEL", "full")
+        # "delta" applies only the rows that changed since the last load;
+        # "full" re-writes every row.
+        self.ingest_mode = os.getenv("INGEST_MODE", "delta")
+        self.rows_touched = 0
+        self._models = {}
+        self._chains = {}
+        self._models_lock = threading.Lock()
+        # (schema version, pruner, corrector), rebuilt when the schema changes.
+        self._schema_tools = None
+        self.schema_pruning = os.getenv("SCHEMA_PRUNING", "1") != "0"
+        self.limiter = ConcurrencyLimiter(
+            max_concurrency=env_int("LLM_MAX_CONCURRENCY", 8),
+            max_queue=env_int("LLM_MAX_QUEUE", 32),
+            queue_timeout=env_float("LLM_QUEUE_TIMEOUT", 30.0))
+        self.cypher_cache = CypherCache(
+            max_size=env_int("CYPHER_CACHE_SIZE", 1024),
+            ttl=env_float("CYPHER_CACHE_TTL"),
+            path=os.getenv("CYPHER_CACHE_PATH"))
+        self.answer_cache = LRUCache(
+            max_size=env_int("ANSWER_CACHE_SIZE", 1024),
+            ttl=env_float("ANSWER_CACHE_TTL"))
+        self.single_flight = SingleFlight()
+        self.jobs = JobRegistry()
+        self.intent_router = IntentRouter()
+        self.intent_fast_path = os.getenv("INTENT_FAST_PATH", "1") != "0"
+        self.entity_resolver = EntityResolver()
+        self.fuzzy_entities = os.getenv("FUZZY_ENTITIES", "1") != "0"
+        # "1": snapshot read from Neo4j; "csv": after /populate_data it is
+        # built from the ingested file instead of reading the graph back.
+        self.snapshot_source = os.getenv("GRAPH_SNAPSHOT", "0")
+        self.snapshot_enabled = self.snapshot_source != "0"
+        self.snapshot = None
+        self.answer_renderer = AnswerRenderer()
+        self.compact_context = os.getenv("COMPACT_CONTEXT", "1") != "0"
+        self.compactor = ContextCompactor(
+            token_budget=env_int("QA_CONTEXT_TOKENS", 1000))
+        self.parameterize_cypher = os.getenv("CYPHER_PARAMETERIZE", "1") != "0"
+        self.query_templates = QueryTemplates(
+            plan_cache_size=env_int("NEO4J_QUERY_CACHE_SIZE", 1000))
+        self.plan_warmup = None
+        self.model_warmup = None
+        # Filled in by the app at startup (see main.py).
+        self.startup = None
+        self.verbose = os.getenv("LLM_VERBOSE", "0") == "1"
+        self.metrics = PipelineMetrics()
+        self.register_metrics()
+        self.refresh_indexes()
+        if os.getenv("CYPHER_PLAN_WARMUP", "0") == "1":
+            self.warm_plans(limit=env_int("CYPHER_PLAN_WARMUP_LIMIT", 50))
+        warmup_models = [model.strip() for model in os.getenv("LLM_WARMUP", "").split(",")
+                         if model.strip()]
+        if warmup_models:
+            self.warm_models(warmup_models)
+
+    def close(self):
+        self.limiter.shutdown()
+        self.cypher_cache.close()
+        self.graphDB_instance.close()
+
+    def register_metrics(self):
+        metrics = self.metrics
+        limiter = self.limiter
+        metrics.register_function(
+            "qa_queue_depth", "Requests waiting for a QA slot.", lambda: limiter.queue_depth)
+        metrics.register_function(
+            "qa_in_flight", "Requests currently being answered.", lambda: limiter.in_flight)
+        metrics.register_function(
+            "qa_rejected_total", "Requests rejected because the queue was full.",
+            lambda: limiter.rejected, kind="counter")
+        metrics.register_function(
+            "cypher_cache_hits_total", "Cypher cache hits.",
+            lambda: self.cypher_cache.hits, kind="counter")
+        metrics.register_function(
+            "cypher_cache_misses_total", "Cypher cache misses.",
+            lambda: self.cypher_cache.misses, kind="counter")
+        metrics.register_function(
+            "answer_cache_hits_total", "Answer cache hits.",
+            lambda: self.answer_cache.hits, kind="counter")
+        metrics.register_function(
+            "answer_cache_misses_total", "Answer cache misses.",
+            lambda: self.answer_cache.misses, kind="counter")
+        metrics.register_function(
+            "answer_coalesced_total", "Requests coalesced onto an identical in-flight request.",
+            lambda: self.single_flight.coalesced, kind="counter")
+        metrics.register_function(
+            "neo4j_schema_refreshes_total", "Schema introspections run.",
+            lambda: type(self.graphDB_instance).schema_refreshes, kind="counter")
+        metrics.register_function(
+            "qa_template_answers_total", "Answers written from a template instead of the QA model.",
+            lambda: self.answer_renderer.stats()["rendered_total"], kind="counter")
+        metrics.register_function(
+            "qa_template_fallbacks_total", "Results the answer templates could not classify.",
+            lambda: self.answer_renderer.fallbacks, kind="counter")
+        metrics.register_function(
+            "neo4j_query_templates", "Distinct query templates sent to Neo4j.",
+            lambda: len(self.query_templates.counts))
+        metrics.register_function(
+            "neo4j_plan_cache_hits_total", "Queries whose template was recently sent (estimated plan cache hits).",
+            lambda: self.query_templates.plan_cache.hits, kind="counter")
+        metrics.register_function(
+            "neo4j_plan_cache_misses_total", "Queries with a new or evicted template (estimated re-plans).",
+            lambda: self.query_templates.plan_cache.misses, kind="counter")
+        metrics.register_function(
+            "entity_resolutions_total", "Questions whose entity names were corrected before answering.",
+            lambda: self.entity_resolver.resolved, kind="counter")
+        metrics.register_function(
+            "entity_empty_results_prevented_total",
+            "Corrected questions that returned rows their original spelling would not have.",
+            lambda: self.entity_resolver.empty_results_prevented, kind="counter")
+        metrics.register_function(
+            "ingest_rows_touched_total", "Person rows inserted, updated or deleted by /populate_data.",
+            lambda: self.rows_touched, kind="counter")
+        metrics.register_function(
+            "qa_context_tokens_saved_total", "Estimated QA prompt tokens removed by result compaction.",
+            lambda: self.compactor.stats()["saved_tokens"], kind="counter")
 
-    def populate_data(self):
-        self.graphDB_instance.populate_data_hr()
-        return {"result": self.graphDB_instance.get_graph().schema}
+    def callbacks(self, callbacks):
+        if self.verbose:
+            return callbacks + [StdOutCallbackHandler()]
+        return callbacks
 
-    def delete_data(self):
-        self.graphDB_instance.delete_data_hr()
-        return {"result": self.graphDB_instance.get_graph().schema}
+    def refresh_indexes(self, path: str = None):
+        """Rebuilds the entity and fuzzy name indexes and, when enabled, the
+        graph snapshot.
+        ``path`` is the CSV that was just ingested."""
+        if self.snapshot_enabled:
+            if path and self.snapshot_source == "csv":
+                snapshot = GraphSnapshot.from_csv(path)
+            else:
+                snapshot = GraphSnapshot.from_graph(self.graphDB_instance.get_graph())
+            # Swapped in whole, so requests see either the old or the new
+            # snapshot, never a partial one.
+            self.snapshot = snapshot
+        if self.intent_fast_path or self.fuzzy_entities:
+            if self.snapshot is not None:
+                index = EntityIndex(self.snapshot.person_names(), self.snapshot.projects)
+            else:
+                index = EntityIndex.load(self.graphDB_instance.get_graph())
+            self.intent_router.set_index(index)
+            if self.fuzzy_entities:
+                self.entity_resolver.set_index(FuzzyNameIndex(index))
+
+    def execute(self, graph_db, cypher: str, params: dict = None,
+                trace: RequestTrace = None):
+        """Runs ``cypher`` on the snapshot when it can answer it, otherwise
+        on Neo4j."""
+        trace = trace or RequestTrace()
+        snapshot = self.snapshot
+        if snapshot is not None:
+            with trace.stage("snapshot_execution"):
+                rows = snapshot.execute(cypher, params)
+            if rows is not None:
+                return rows
+        if self.parameterize_cypher:
+            with trace.stage("cypher_parameterize"):
+                template, params, lifted = parameterize(cypher, params)
+                self.query_templates.record(cypher, template, lifted)
+                cypher = template
+        with trace.stage("cypher_execution"):
+            return graph_db.query(cypher, params=params or {})
+
+    def warm_plans(self, limit: int = 50):
+        """Plans the intent queries and the most common templates among the
+        cached Cypher with EXPLAIN, so the first real requests do not pay
+        for planning."""
+        started = time.perf_counter()
+        templates = {cypher: {"name": ""} for _, _, cypher, _ in INTENTS.values()}
+        counts = Counter()
+        samples = {}
+        for cypher in self.cypher_cache.entries():
+            template, params, _ = parameterize(cypher)
+            counts[template] += 1
+            samples.setdefault(template, params)
+        for template, _ in counts.most_common(limit):
+            templates.setdefault(template, samples[template])
+
+        graph_db = self.graphDB_instance.get_graph()
+        warmed = failed = 0
+        for template, params in templates.items():
+            try:
+                graph_db.query("EXPLAIN " + template, params=params)
+                warmed += 1
+            except Exception:
+                failed += 1
+        self.plan_warmup = {"warmed": warmed, "failed": failed,
+                            "seconds": time.perf_counter() - started}
+        return self.plan_warmup
+
+    def warm_models(self, models):
+        """Creates the clients and chains for ``models`` and loads local
+        models into memory, so the first request pays for neither the
+        provider import nor the model load."""
+        started = time.perf_counter()
+        warmed = {}
+        failed = {}
+        for model in models:
+            model_started = time.perf_counter()
+            try:
+                for kind in ("cypher", "qa", "rephrase"):
+                    self.chain(model, kind)
+                if model == "llama" and self.model_factory is None:
+                    # An empty prompt only loads the model; OLLAMA_KEEP_ALIVE
+                    # decides how long it stays loaded.
+                    self.choose_model(model).invoke("")
+                warmed[model] = time.perf_counter() - model_started
+            except Exception as exc:
+                logger.warning("Warmup of model %s failed: %s", model, exc)
+                failed[model] = str(exc)
+        self.model_warmup = {"warmed": warmed, "failed": failed,
+                             "seconds": time.perf_counter() - started}
+        return self.model_warmup
+
+    def populate_data(self, full: bool = False):
+        load = (self.graphDB_instance.populate_data_hr
+                if full or self.ingest_mode == "full" else self.graphDB_instance.sync_data_hr)
+        response = load(
+            path=os.getenv("HR_DATA_PATH"),
+            batch_size=env_int("INGEST_BATCH_SIZE", 5000),
+            workers=env_int("INGEST_WORKERS", 4),
+            model=self.graph_model)
+        ingest = response["ingest"]
+        self.rows_touched += ingest.get("touched", ingest["rows"])
+        # An unchanged file leaves the caches, indexes and snapshot valid.
+        if ingest.get("changed", True):
+            self.answer_cache.clear()
+            self.refresh_indexes(path=ingest["path"])
+        return {"result": self.graphDB_instance.get_graph().schema,
+                "ingest": response["ingest"]}
+
+    def delete_data(self, progress=None):
+        response = self.graphDB_instance.delete_data_hr(
+            batch_size=env_int("DELETE_BATCH_SIZE", 10000), progress=progress)
+        self.answer_cache.clear()
+        self.refresh_indexes()
+        return {"result": self.graphDB_instance.get_graph().schema,
+                "delete": response["delete"]}
+
+    def start_delete_job(self):
+        job = self.jobs.start(
+            "delete_data", lambda job: self.delete_data(progress=job.update))
+        return job.as_dict()
+
+    def get_job(self, job_id: str):
+        job = self.jobs.get(job_id)
+        return job.as_dict() if job is not None else None
+
+    def refresh_schema(self):
+        return {"result": self.graphDB_instance.refresh_schema()}
+
+    def stats(self):
+        return {"neo4j": self.graphDB_instance.stats(),
+                "limiter": self.limiter.stats(),
+                "cypher_cache": self.cypher_cache.stats(),
+                "answer_cache": dict(self.answer_cache.stats(),
+                                     **self.single_flight.stats()),
+                "intents": self.intent_router.stats(),
+                "entities": self.entity_resolver.stats(),
+                "snapshot": self.snapshot.stats() if self.snapshot is not None else None,
+                "query_templates": dict(self.query_templates.stats(),
+                                        plan_warmup=self.plan_warmup),
+                "answers": self.answer_renderer.stats(),
+                "context": self.compactor.stats(),
+                "startup": dict(self.startup or {}, model_warmup=self.model_warmup)}
 
     def choose_model(self, model: str = ""):
+        # Clients are created once per model and shared by every request,
+        # so batches and concurrent requests reuse the same HTTP pools.
+        client = self._models.get(model)
+        if client is None:
+            with self._models_lock:
+                client = self._models.get(model)
+                if client is None:
+                    client = self._models[model] = self.create_model(model)
+        return client
+
+    def create_model(self, model: str = ""):
+        # Providers are imported on first use: each takes about a second to
+        # import, and a worker usually serves only one of them.
+        if self.model_factory is not None:
+            return self.model_factory(model)
         if model == "llama":
-            return OllamaLLM(model="llama3.1", temperature=0)
+            from langchain_ollama.llms import OllamaLLM
+            return OllamaLLM(model="llama3.1", temperature=0, keep_alive=ollama_keep_alive())
         elif model == "openai":
+            from langchain_openai import ChatOpenAI
             return ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=os.getenv("OPENAI_API_KEY"))
 
-    def generate_response(self, question: Question) -> str:
-
-        cypher_generation_template = """
-        <Task>
-        Generate Cypher query for a Neo4j graph database.
-        </Task>
-        <Instructions>
-        Use only the provided relationship types and properties in the schema.
-        Do not use any other relationship types or properties that are not provided.
-        </Instructions>
-        <Schema>
-        {schema}
-        </Schema>
-        <Note>
-        Do not include any explanations or apologies in your responses.
-        Do not respond to any questions that might ask anything other than
-        for you to construct a Cypher statement. Do not include any text except
-        the generated Cypher statement. Make sure the direction of the relationship is
-        correct in your queries. Make sure you alias both entities and relationships
-        properly. Do not run any queries that would add to or delete from
-        the database. Make sure to alias all statements that follow as with
-        statement (e.g. WITH c as customer, o.orderID as order_id).
-        If you need to divide numbers, make sure to
-        filter the denominator to be non-zero.
-        Always include id, full_name, position, department, tech_mentor, career_mentor, project.
-        </Note>
-        <Examples>
-        # Find the mentor of a person
-        Use the relationship IS_CAREER_MENTEE_OF or IS_TECH_MENTOR_OF and return all information
-        # Find the mentees of a person
-        Use the relationship IS_CAREER_MENTOR_OF or IS_TECH_MENTEE_OF and return all information
-        # Find the project and people who works on a project
-        Use the relationship WORKS_ON and return all information including project name
-        String category values:
-        Use existing strings and values from the schema provided. 
-        </Examples>
-        <Question>
-        {question}
-        </Question>
-        """
-
-        qa_generation_template_str = """
-        <Task>
-        You are an assistant that takes the results from a Neo4j Cypher query and forms a human-readable response. The query results section contains the results of a Cypher query that was generated based on a user's natural language question. The provided information is authoritative; you must never question it or use your internal knowledge to alter it. Make the answer sound like a response to the question.
-        Always assume the query results is the answer to your question.
-        </Task>
-        <Query Results>
-        {context}
-        </Query Results>
-        <Question>
-        {question}
-        </Question>
-        <Note>
-        If the provided information is empty, respond by stating that you don't know the answer. Empty information is indicated by: []. If there is a cypher context provided, answer using the context.
-        When names are provided in the query results, such as hospital names, be cautious of any names containing commas or other punctuation. For example, 'Jones, Brown and Murray' is a single hospital name, not multiple hospitals. Ensure that any list of names is presented clearly to avoid ambiguity and make the full names easily identifiable.
-        Never state that you lack sufficient information if data is present in the query results. Always utilize the data provided.
-        Only output relevant information and only use purely text in output formatting. Do not use newline. Just answer the question, do not write any irrelevant sentences. Do not include the question in the output.
-        </Note>
-        <Format>
-        Question: Find is_tech_mentor_of William Hoover
-        Answer: Bryan Wheeler is the tech mentor of William Hoover
-        Question: Find is_tech_mentee_of Scott Stafford
-        Answer: Tech mentee of Scott Stafford are: Bryan Wheeler, Kristin Johnson, Jeffery Dominguez
-        Question: Find all person who works on Market Research Tool
-        Answer: Employees who worked on Market Research Tool are: Bryan Wheeler, Kristin Johnson, Jeffery Dominguez
-        Question: Find project of Bryan Wheeler
-        Answer: Bryan Wheeler worked on Market Research Tool, and Digital Payment Integration
-        </Format>
-        """
-
-        llm = self.choose_model(question.model)
+    def chain(self, model: str, kind: str):
+        """Prompt | model (| parser) for ``kind``, built once per model."""
+        key = (model, kind)
+        chain = self._chains.get(key)
+        if chain is None:
+            llm = self.choose_model(model)
+            with self._models_lock:
+                chain = self._chains.get(key)
+                if chain is None:
+                    if kind == "cypher":
+                        chain = (CYPHER_GENERATION_PROMPTS[self.graph_model]
+                                 | llm | StrOutputParser())
+                    elif kind == "qa":
+                        chain = QA_GENERATION_PROMPT | llm | StrOutputParser()
+                    else:
+                        chain = REPHRASE_PROMPT | llm
+                    self._chains[key] = chain
+        return chain
 
-        graph_db = self.graphDB_instance.get_graph()
+    def schema_tools(self, graph_db):
+        """Returns the schema pruner and Cypher corrector for the current
+        schema version."""
+        version = self.graphDB_instance.schema_version
+        tools = self._schema_tools
+        if tools is None or tools[0] != version:
+            structured_schema = graph_db.structured_schema
+            corrector = CypherQueryCorrector([
+                CypherSchema(el["start"], el["type"], el["end"])
+                for el in structured_schema.get("relationships", [])
+            ])
+            tools = self._schema_tools = (
+                version, SchemaPruner(structured_schema), corrector)
+        return tools[1], tools[2]
+
+    def prompt_schema(self, question: str, graph_db, trace: RequestTrace) -> str:
+        schema = graph_db.schema
+        if not self.schema_pruning:
+            return schema
+        pruner, _ = self.schema_tools(graph_db)
+        found = self.intent_router.index.find(normalize_name(question).split())
+        pruned = pruner.prune(question, [found[0]] if found else ())
+        if pruned is None:
+            return schema
+        trace.schema = {"full_tokens": estimate_tokens(schema),
+                        "pruned_tokens": estimate_tokens(pruned)}
+        logger.info("Cypher prompt schema pruned from %d to %d estimated tokens",
+                    trace.schema["full_tokens"], trace.schema["pruned_tokens"])
+        return pruned
+
+    def answer_key(self, question: Question):
+        # The graph version is part of the key, so answers computed before a
+        # populate/delete are never served afterwards.
+        return (normalize_question(question.question), question.model,
+                question.answer_mode, self.graphDB_instance.graph_version)
+
+    def generate_response(self, question: Question, trace: RequestTrace = None) -> dict:
+        trace = trace or RequestTrace()
+        key = self.answer_key(question)
+        response = self.answer_cache.get(key)
+        if response is not None:
+            response = {"result": response["result"], "path": "cache"}
+        else:
+            response, leader = self.single_flight.do(
+                key, lambda: (self._answer(question, trace), trace))
+            if leader is not trace:
+                trace.follow(leader)
+            self.answer_cache.set(key, response)
+
+        self.metrics.observe(trace, "generate_response",
+                             "coalesced" if trace.coalesced else response["path"])
+        return response
 
-        cypher_generation_prompt = PromptTemplate(
-            input_variables=["schema", "question"], template=cypher_generation_template
-        )
-
-        qa_generation_prompt = PromptTemplate(
-            input_variables=["context", "question"], template=qa_generation_template_str
-        )
-
-        chain = GraphCypherQAChain.from_llm(
-            top_k=100,
-            graph=graph_db,
-            verbose=True,
-            validate_cypher=True,
-            qa_prompt=qa_generation_prompt,
-            cypher_prompt=cypher_generation_prompt,
-            qa_llm=llm,
-            cypher_llm=llm,
-            allow_dangerous_requests=True
-        )
+    def stream_response(self, question: Question, trace: RequestTrace = None):
+        """Yields (event, data) pairs: "cypher" and "rows" as soon as they are
+        known, then "token" chunks of the answer, then "done"."""
+        trace = trace or RequestTrace()
+        key = self.answer_key(question)
+        response = self.answer_cache.get(key)
+        if response is not None:
+            trace.mark_first_token()
+            yield "token", {"text": response["result"]}
+            done = {"result": response["result"], "path": "cache"}
+        else:
+            for event, done in self._answer_events(question, trace, stream=True):
+                if event != "done":
+                    yield event, done
+            self.answer_cache.set(key, done)
+
+        self.metrics.observe(trace, "generate_response_stream", done["path"])
+        yield "done", done
+
+    def _answer(self, question: Question, trace: RequestTrace) -> dict:
+        for _, data in self._answer_events(question, trace, stream=False):
+            pass
+        return data
+
+    def _answer_events(self, question: Question, trace: RequestTrace, stream: bool):
+        with trace.stage("schema"):
+            graph_db = self.graphDB_instance.get_graph()
+
+        text = question.question
+        resolutions = ()
+        if self.fuzzy_entities:
+            # Misspelled or partial names are replaced by the canonical ones
+            # so neither path queries a name that does not exist.
+            with trace.stage("entity_resolution"):
+                text, resolutions = self.entity_resolver.resolve(text)
+            if resolutions:
+                trace.entities = [resolution.as_dict() for resolution in resolutions]
+
+        if self.intent_fast_path and question.answer_mode != AnswerModeEnum.llm:
+            with trace.stage("intent_match"):
+                match = self.intent_router.match(text)
+            if match is not None:
+                trace.cypher = match.cypher
+                yield "cypher", {"cypher": match.cypher, "params": match.params}
+                rows = self.execute(graph_db, match.cypher, match.params, trace)
+                trace.rows = len(rows)
+                self.entity_resolver.record(resolutions, rows)
+                yield "rows", {"count": len(rows)}
+                result = match.render(rows)
+                trace.mark_first_token()
+                yield "token", {"text": result}
+                yield "done", {"result": result, "path": "intent"}
+                return
 
         # rephrased_prompt = self.rephrase_prompt(question)
-        rephrased_prompt = question.question
-
-        response = chain.invoke(
-            {rephrased_prompt})
-
-        return response.get("result", "")
-
-    def rephrase_prompt(self, question: Question) -> str:
-        template = """
-        <Note>
-        Rephrase the question to one of the following and replace the name with the provided name in the context:
-        Find career mentor of <name>
-        Find tech mentor of <name>
-        Find career mentee of <name>
-        Find tech mentee of <name>
-        Find the department of <name>
-        Find the id of <name>
-        Find the full_name of <name>
-        Find the position of <name>
-        Find all person who works_on <project>
-        Find project of <name>
-        </Note>
-        <Question>
-        {question}
-        </Question>
-        <Output format>
-        Do not include any unnecessary sentences. Just output the rephrased question
-        </Output format>
-        """
-
-        prompt = ChatPromptTemplate.from_template(template)
-
-        chain = prompt | self.choose_model(question.model)
-
-        response = chain.invoke(
-            {question.question})
+        rephrased_prompt = text
+
+        cypher = self.generate_cypher(
+            rephrased_prompt, question.model, graph_db, trace)
+        trace.cypher = cypher
+        yield "cypher", {"cypher": cypher}
+
+        # The corrector returns an empty query when it finds relationships
+        # that do not exist in the schema.
+        rows = self.execute(graph_db, cypher, trace=trace)[:TOP_K] if cypher else []
+        trace.rows = len(rows)
+        self.entity_resolver.record(resolutions, rows)
+        yield "rows", {"count": len(rows)}
+
+        if question.answer_mode != AnswerModeEnum.llm:
+            with trace.stage("answer_template"):
+                if question.answer_mode == AnswerModeEnum.template:
+                    result = self.answer_renderer.render_any(rephrased_prompt, cypher, rows)
+                else:
+                    result = self.answer_renderer.render(rephrased_prompt, cypher, rows)
+            if result is not None:
+                trace.mark_first_token()
+                yield "token", {"text": result}
+                yield "done", {"result": result, "path": "template"}
+                return
+
+        if self.compact_context:
+            with trace.stage("context_compaction"):
+                context, trace.context = self.compactor.compact(rephrased_prompt, rows)
+        else:
+            context = rows
+
+        if self.verbose:
+            print_text("Generated Cypher:", end="\n")
+            print_text(cypher, color="green", end="\n")
+            print_text("Full Context:", end="\n")
+            print_text(str(context), color="green", end="\n")
+
+        qa_chain = self.chain(question.model, "qa")
+        inputs = {"context": context, "question": rephrased_prompt}
+
+        with trace.llm_stage("qa_generation") as callbacks:
+            config = {"callbacks": self.callbacks(callbacks)}
+            if stream:
+                chunks = []
+                for chunk in qa_chain.stream(inputs, config=config):
+                    trace.mark_first_token()
+                    chunks.append(chunk)
+                    yield "token", {"text": chunk}
+                result = "".join(chunks)
+            else:
+                result = qa_chain.invoke(inputs, config=config)
+        yield "done", {"result": result, "path": "llm"}
+
+    def generate_cypher(self, question: str, model: str, graph_db,
+                        trace: RequestTrace = None) -> str:
+        trace = trace or RequestTrace()
+        cache_key = CypherCache.make_key(
+            question, model, self.graphDB_instance.schema_hash)
+        with trace.stage("cypher_cache"):
+            cypher = self.cypher_cache.get(cache_key)
+        if cypher is not None:
+            return cypher
+
+        cypher_chain = self.chain(model, "cypher")
+        with trace.stage("schema_pruning"):
+            schema = self.prompt_schema(question, graph_db, trace)
+
+        with trace.llm_stage("cypher_generation") as callbacks:
+            cypher = extract_cypher(cypher_chain.invoke(
+                {"schema": schema, "question": question},
+                config={"callbacks": self.callbacks(callbacks)}))
+
+        _, corrector = self.schema_tools(graph_db)
+        cypher = corrector(cypher)
+
+        if cypher:
+            self.cypher_cache.set(cache_key, cypher)
+        return cypher
+
+    def rephrase_prompt(self, question: Question, trace: RequestTrace = None) -> str:
+        trace = trace or RequestTrace()
+        chain = self.chain(question.model, "rephrase")
+        with trace.llm_stage("rephrase") as callbacks:
+            response = chain.invoke(
+                {"question": question.question},
+                config={"callbacks": self.callbacks(callbacks)})
+        self.metrics.observe(trace, "rephrase_prompt", "llm")
 
         if question.model == "openai":
             return response.content
@@ -0,0 +1,214 @@
+import sys
+import time
+from array import array
+
+from .ingest import parse_projects, read_rows
+from .intents import INTENTS, parameterize_name
+
+PEOPLE_QUERY = ("MATCH (p:Person) RETURN p.id AS id, p.full_name AS full_name, "
+                "p.position AS position, p.department AS department")
+PROJECTS_QUERY = "MATCH (p:Project) RETURN p.name AS name"
+WORKS_ON_EDGES_QUERY = "MATCH (p:Person)-[:WORKS_ON]->(proj:Project) RETURN p.id AS id, proj.name AS project"
+MENTOR_EDGES_QUERY = "MATCH (m:Person)-[:{}]->(p:Person) RETURN m.id AS mentor_id, p.id AS id"
+
+MENTOR_RELATIONSHIPS = {"career": "IS_CAREER_MENTOR_OF", "tech": "IS_TECH_MENTOR_OF"}
+
+
+class PersonRecord:
+    __slots__ = ("id", "full_name", "position", "department")
+
+    def __init__(self, id, full_name, position, department) -> None:
+        self.id = id
+        self.full_name = full_name
+        self.position = position
+        self.department = department
+
+
+class Adjacency:
+    """Compressed sparse rows: the neighbours of node ``i`` are
+    ``targets[offsets[i]:offsets[i + 1]]``."""
+
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, size: int, edges) -> None:
+        counts = [0] * (size + 1)
+        for source, _ in edges:
+            counts[source + 1] += 1
+        for i in range(size):
+            counts[i + 1] += counts[i]
+        self.offsets = array("I", counts)
+        targets = [0] * len(edges)
+        cursor = counts[:-1]
+        for source, target in edges:
+            targets[cursor[source]] = target
+            cursor[source] += 1
+        self.targets = array("I", targets)
+
+    def neighbors(self, node: int):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def nbytes(self) -> int:
+        return (len(self.offsets) * self.offsets.itemsize
+                + len(self.targets) * self.targets.itemsize)
+
+
+class GraphSnapshot:
+    """Read-only, in-process copy of the HR graph.
+
+    People and projects are numbered; relationships are stored in both
+    directions as ``Adjacency`` arrays and strings are interned, so a
+    100k-person org fits in a few tens of MB. ``execute`` answers the
+    intent queries (including the multi-hop "everyone under X") and
+    returns None for anything else.
+    """
+
+    def __init__(self, people, projects, mentorships, works_on, source: str = "") -> None:
+        started = time.perf_counter()
+        self.people = people
+        self.projects = projects
+        self.source = source
+        self.people_by_name = {}
+        for index, person in enumerate(people):
+            self.people_by_name.setdefault(person.full_name, []).append(index)
+        self.project_index = {name: index for index, name in enumerate(projects)}
+
+        size = len(people)
+        self.mentees = {kind: Adjacency(size, edges) for kind, edges in mentorships.items()}
+        self.mentors = {kind: Adjacency(size, [(t, s) for s, t in edges])
+                        for kind, edges in mentorships.items()}
+        self.projects_of = Adjacency(size, works_on)
+        self.members_of = Adjacency(len(projects), [(t, s) for s, t in works_on])
+        self.build_seconds = time.perf_counter() - started
+        self.built_at = time.time()
+        self.nbytes = self.memory_footprint()
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], {kind: [] for kind in MENTOR_RELATIONSHIPS}, [], source="empty")
+
+    @classmethod
+    def build(cls, person_rows, project_names, mentor_rows, works_on_rows, source: str):
+        """``mentor_rows`` maps "career"/"tech" to (mentor id, id) pairs;
+        ``works_on_rows`` are (id, project name) pairs."""
+        started = time.perf_counter()
+        intern = sys.intern
+        people = []
+        index_by_id = {}
+        for row in person_rows:
+            if row["id"] in index_by_id:
+                continue
+            index_by_id[row["id"]] = len(people)
+            people.append(PersonRecord(
+                intern(str(row["id"])), intern(row["full_name"] or ""),
+                intern(row["position"] or ""), intern(row["department"] or "")))
+        projects = [intern(name) for name in dict.fromkeys(project_names)]
+        project_index = {name: index for index, name in enumerate(projects)}
+
+        mentorships = {kind: [(index_by_id[mentor_id], index_by_id[person_id])
+                              for mentor_id, person_id in pairs
+                              if mentor_id in index_by_id and person_id in index_by_id]
+                       for kind, pairs in mentor_rows.items()}
+        works_on = [(index_by_id[person_id], project_index[name])
+                    for person_id, name in works_on_rows
+                    if person_id in index_by_id and name in project_index]
+        snapshot = cls(people, projects, mentorships, works_on, source=source)
+        snapshot.build_seconds = time.perf_counter() - started
+        return snapshot
+
+    @classmethod
+    def from_graph(cls, graph_db):
+        people = graph_db.query(PEOPLE_QUERY)
+        projects = [row["name"] for row in graph_db.query(PROJECTS_QUERY)]
+        mentor_rows = {kind: [(row["mentor_id"], row["id"])
+                              for row in graph_db.query(MENTOR_EDGES_QUERY.format(rel_type))]
+                       for kind, rel_type in MENTOR_RELATIONSHIPS.items()}
+        works_on = [(row["id"], row["project"]) for row in graph_db.query(WORKS_ON_EDGES_QUERY)]
+        return cls.build(people, projects, mentor_rows, works_on, source="neo4j")
+
+    @classmethod
+    def from_csv(cls, path: str):
+        # Mentors are resolved by name the same way BulkIngest does: the
+        # first person with that name, never the person themselves.
+        rows = list(read_rows(path))
+        ids_by_name = {}
+        for row in rows:
+            ids_by_name.setdefault(row["full_name"], row["id"])
+        mentor_rows = {kind: [] for kind in MENTOR_RELATIONSHIPS}
+        works_on = []
+        for row in rows:
+            for kind in MENTOR_RELATIONSHIPS:
+                mentor_id = ids_by_name.get(row[f"{kind}_mentor"])
+                if mentor_id and mentor_id != row["id"]:
+                    mentor_rows[kind].append((mentor_id, row["id"]))
+            works_on.extend((row["id"], name) for name in parse_projects(row["project"]))
+        projects = [name for _, name in works_on]
+        return cls.build(rows, projects, mentor_rows, works_on, source="csv")
+
+    def person_names(self):
+        return list(self.people_by_name)
+
+    def reports(self, roots):
+        """Everyone reachable from ``roots`` over career mentorships."""
+        seen = set(roots)
+        stack = list(roots)
+        adjacency = self.mentees["career"]
+        found = []
+        while stack:
+            for node in adjacency.neighbors(stack.pop()):
+                if node not in seen:
+                    seen.add(node)
+                    found.append(node)
+                    stack.append(node)
+        return found
+
+    def intent_values(self, intent: str, name: str):
+        if intent == "project_members":
+            project = self.project_index.get(name)
+            if project is None:
+                return []
+            return sorted(self.people[i].full_name for i in self.members_of.neighbors(project))
+        roots = self.people_by_name.get(name, ())
+        if intent in ("department", "id", "full_name", "position"):
+            return [getattr(self.people[i], intent) for i in roots]
+        if intent == "projects":
+            return sorted(self.projects[j] for i in roots for j in self.projects_of.neighbors(i))
+        if intent == "reports":
+            return sorted({self.people[i].full_name for i in self.reports(roots)})
+        kind, _, relation = intent.partition("_")
+        edges = self.mentees if relation == "mentees" else self.mentors
+        return sorted(self.people[j].full_name for i in roots for j in edges[kind].neighbors(i))
+
+    def execute(self, cypher: str, params: dict = None):
+        """Rows for the intent queries (parameterized or with the name
+        inlined), or None when the query is outside what the snapshot
+        answers."""
+        cypher, params = parameterize_name(cypher, params)
+        for intent, (_, _, intent_cypher, _) in INTENTS.items():
+            if cypher == intent_cypher and "name" in params:
+                return [{"value": value} for value in self.intent_values(intent, params["name"])]
+        return None
+
+    def memory_footprint(self) -> int:
+        strings = {id(value): value for person in self.people
+                   for value in (person.id, person.full_name, person.position, person.department)}
+        strings.update((id(name), name) for name in self.projects)
+        adjacency = [*self.mentees.values(), *self.mentors.values(),
+                     self.projects_of, self.members_of]
+        return (sum(sys.getsizeof(person) for person in self.people)
+                + sum(sys.getsizeof(value) for value in strings.values())
+                + sys.getsizeof(self.people) + sys.getsizeof(self.projects)
+                + sys.getsizeof(self.people_by_name) + sys.getsizeof(self.project_index)
+                + sum(sys.getsizeof(indices) for indices in self.people_by_name.values())
+                + sum(graph.nbytes() for graph in adjacency))
+
+    def stats(self):
+        return {
+            "source": self.source,
+            "people": len(self.people),
+            "projects": len(self.projects),
+            "mentorships": {kind: len(graph.targets) for kind, graph in self.mentees.items()},
+            "works_on": len(self.projects_of.targets),
+            "memory_bytes": self.nbytes,
+            "build_seconds": self.build_seconds,
+            "built_at": self.built_at,
+        }
@@ -1,7 +1,63 @@
-from fastapi import FastAPI
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+# Before the app modules, some of which read their settings at import time.
+load_dotenv()
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
 from .llm import router
+from .llm.exceptions import QueueFullError, QueueTimeoutError
+from .llm.service import Service
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
+# uvicorn's logger, so the startup report shows up in the server log.
+logger = logging.getLogger("uvicorn.error")
+
+
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    return JSONResponse(status_code=429, content={"detail": str(exc)},
+                        headers={"Retry-After": "1"})
+
+
+async def queue_timeout_handler(request: Request, exc: QueueTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)},
+                        headers={"Retry-After": "5"})
+
+
+def create_app(service_factory=Service) -> FastAPI:
+    """``service_factory`` builds the Service at startup; the load
+    generator passes one backed by the stand-ins in src/bench."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # One Service (and therefore one pooled Neo4j driver and one cached
+        # schema) for the lifetime of the worker process.
+        started = time.perf_counter()
+        service = service_factory()
+        ready = time.perf_counter()
+        service.startup = {"import_seconds": IMPORT_SECONDS,
+                           "service_seconds": ready - started,
+                           "time_to_ready_seconds": ready - IMPORT_STARTED}
+        logger.info("Startup: imports %.2fs, service %.2fs, ready after %.2fs",
+                    IMPORT_SECONDS, ready - started, ready - IMPORT_STARTED)
+        app.state.service = service
+        yield
+        app.state.service.close()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(router.llm_router)
+    app.add_exception_handler(QueueFullError, queue_full_handler)
+    app.add_exception_handler(QueueTimeoutError, queue_timeout_handler)
+    return app
 
-app = FastAPI()
 
-app.include_router(router.llm_router)
+app = create_app()
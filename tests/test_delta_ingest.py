@@ -0,0 +1,81 @@
+import itertools
+
+import pytest
+
+from src.bench.fakes import InMemoryNeo4j
+from src.llm.ingest import DEFAULT_DATA_PATH, BulkIngest, read_rows
+from src.llm.snapshot import GraphSnapshot
+
+BASE_ROWS = list(itertools.islice(read_rows(DEFAULT_DATA_PATH), 300))
+
+
+def graph_state(graph):
+    snapshot = GraphSnapshot.from_graph(graph.get_graph())
+    people = snapshot.people
+    return {
+        "people": {(p.id, p.full_name, p.position, p.department) for p in people},
+        "projects": set(snapshot.projects),
+        "mentorships": {kind: {(people[i].id, people[j].id)
+                               for i in range(len(people)) for j in adjacency.neighbors(i)}
+                        for kind, adjacency in snapshot.mentees.items()},
+        "works_on": {(people[i].id, snapshot.projects[j])
+                     for i in range(len(people)) for j in snapshot.projects_of.neighbors(i)},
+    }
+
+
+def load(rows, model, graph=None, delta=False):
+    graph = graph or InMemoryNeo4j()
+    ingest = BulkIngest(graph, batch_size=50, workers=2, model=model)
+    stats = (ingest.run_delta if delta else ingest.run)(lambda: iter([dict(row) for row in rows]))
+    return graph, stats
+
+
+def edited(rows):
+    """A rename of a mentor, a deleted mentor, a project change, a new hire
+    and a mentor change, as a later export would have them."""
+    rows = [dict(row) for row in rows]
+    mentors = [row["full_name"] for row in rows if any(
+        other["career_mentor"] == row["full_name"] for other in rows)]
+    renamed, removed = mentors[1], mentors[2]
+    for row in rows:
+        for column in ("career_mentor", "tech_mentor"):
+            if row[column] == renamed:
+                row[column] = renamed + " Jr"
+        if row["full_name"] == renamed:
+            row["full_name"] = renamed + " Jr"
+    rows = [row for row in rows if row["full_name"] != removed]
+    with_projects = next(row for row in rows if row["project"])
+    with_projects["project"] = "['Compliance Management System', 'A New Project']"
+    rows[-1]["tech_mentor"] = rows[0]["full_name"]
+    rows.append(dict(rows[-1], id="999999", full_name="New Hire", project="['Another Project']"))
+    return rows
+
+
+@pytest.mark.parametrize("model", ["full", "compact"])
+def test_delta_matches_full_reload(model):
+    rows = edited(BASE_ROWS)
+    graph, _ = load(BASE_ROWS, model)
+    _, stats = load(rows, model, graph=graph, delta=True)
+    expected, _ = load(rows, model)
+
+    assert stats["mode"] == "delta"
+    assert stats["changed"]
+    assert (stats["inserted"], stats["deleted"]) == (1, 1)
+    assert stats["touched"] < len(rows)
+    assert graph_state(graph) == graph_state(expected)
+
+
+def test_unchanged_file_touches_nothing():
+    graph, _ = load(BASE_ROWS, "full")
+    before = graph_state(graph)
+    _, stats = load(BASE_ROWS, "full", graph=graph, delta=True)
+    assert not stats["changed"]
+    assert stats["touched"] == 0
+    assert graph_state(graph) == before
+
+
+def test_delta_into_empty_graph_is_a_full_load():
+    graph, stats = load(BASE_ROWS, "full", delta=True)
+    expected, _ = load(BASE_ROWS, "full")
+    assert stats["inserted"] == len(BASE_ROWS)
+    assert graph_state(graph) == graph_state(expected)
@@ -0,0 +1,54 @@
+import pytest
+
+from src.llm.fuzzy import FuzzyNameIndex, edit_distance
+from src.llm.intents import EntityIndex
+
+PEOPLE = ["Carmen Benton", "Mark Benton", "Carrie Davis", "Rebecca Carroll", "Travis Black",
+          "Christopher Montgomery"]
+PROJECTS = ["Compliance Management System", "Inventory Management System",
+            "Mobile Application Development", "Product Quality Assurance Initiative"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FuzzyNameIndex(EntityIndex(PEOPLE, PROJECTS))
+
+
+@pytest.mark.parametrize("question", [
+    "Who is the career mentor of Carrie Davis?",
+    "Who is the tech mentor of Carrie Davis?",
+    "Who is Mark's mentor?",
+    "Who reports to Travis Black?",
+    "Who are the tech mentees of Rebecca Carroll?",
+    "What department is Rebecca Carroll in?",
+    "Who is the career mentor of someone?",
+    "Which projects use a management system?",
+    # Department names that are part of a project name.
+    "List all QA Developers in Quality Assurance",
+    "Who is the head of Quality Assurance?",
+])
+def test_ordinary_words_are_not_rewritten(index, question):
+    assert index.resolve(question) == (question, [])
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("Who is Rebeca Carroll's tech mentor?", "Who is Rebecca Carroll's tech mentor?"),
+    ("What department is travis blak in?", "What department is Travis Black in?"),
+    ("Who is under Travs Black?", "Who is under Travis Black?"),
+    ("Who is Christopher Montgomrey's career mentor?",
+     "Who is Christopher Montgomery's career mentor?"),
+    ("Who are part of project Compliance Managment?",
+     "Who are part of project Compliance Management System?"),
+])
+def test_misspelled_and_partial_names_are_resolved(index, question, expected):
+    assert index.resolve(question)[0] == expected
+
+
+def test_short_words_get_one_edit(index):
+    # "Carol" is two edits from "Carroll", too many for a five-letter word.
+    assert index.resolve("Who is Rebecca Carol's tech mentor?")[1] == []
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("montgomrey", "montgomery", 2) == 1
+    assert edit_distance("carol", "carroll", 1) == 2
@@ -0,0 +1,54 @@
+import pytest
+
+from src.llm.intents import EntityIndex, IntentRouter
+
+PEOPLE = ["Rebecca Carroll", "Travis Black"]
+PROJECTS = ["Compliance Management System"]
+
+
+@pytest.fixture
+def router():
+    return IntentRouter(EntityIndex(PEOPLE, PROJECTS))
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("Who is Rebecca Carroll's tech mentor?", "tech_mentor"),
+    ("Who is the career mentor of Rebecca Carroll?", "career_mentor"),
+    ("Who are the tech mentee of Rebecca Carroll?", "tech_mentees"),
+    ("What department is Rebecca Carroll in?", "department"),
+    ("Find the position of Rebecca Carroll", "position"),
+    ("Find project of Rebecca Carroll", "projects"),
+    ("Who reports to Travis Black?", "reports"),
+    ("Who are part of project Compliance Management System?", "project_members"),
+    ("Who works on Compliance Management System?", "project_members"),
+    ("Find all person who works_on Compliance Management System", "project_members"),
+])
+def test_canonical_questions_match(router, question, intent):
+    assert router.match(question).intent == intent
+
+
+@pytest.mark.parametrize("question", [
+    "Which department works on Compliance Management System?",
+    "Who leads the Compliance Management System project?",
+    "When did Compliance Management System start?",
+])
+def test_other_project_questions_go_to_the_llm(router, question):
+    assert router.match(question) is None
+
+
+@pytest.mark.parametrize("question", [
+    "Is Rebecca Carroll a tech mentor?",
+    "Does Rebecca Carroll work on any project?",
+    "What is the role of the tech lead of Rebecca Carroll?",
+    "Who is the head of Rebecca Carroll's department?",
+    "Who is Rebecca Carroll's manager?",
+    "What department are Rebecca Carroll's colleagues in?",
+    "Who else is in Rebecca Carroll's department?",
+    "Who has the same position as Travis Black?",
+    "Which projects is Travis Black not on?",
+    "How many tech mentees does Travis Black have?",
+    "How many people report to Travis Black?",
+    "Who does Travis Black report to?",
+])
+def test_other_person_questions_go_to_the_llm(router, question):
+    assert router.match(question) is None
@@ -0,0 +1,86 @@
+import pytest
+
+from src.llm.parameterize import QueryTemplates, parameterize
+
+
+def test_names_share_a_template():
+    first = parameterize("MATCH (p:Person {full_name: 'Rebecca Carroll'}) RETURN p.department")
+    second = parameterize("MATCH (p:Person {full_name: 'Travis Black'}) RETURN p.department")
+    assert first[0] == second[0] == "MATCH (p:Person {full_name: $full_name}) RETURN p.department"
+    assert first[1] == {"full_name": "Rebecca Carroll"}
+    assert first[2] == 1
+
+
+def test_property_comparisons_name_the_parameter():
+    template, params, _ = parameterize(
+        "MATCH (p:Person) WHERE p.department = 'Engineering' AND p.position <> \"CEO\" RETURN p")
+    assert template == "MATCH (p:Person) WHERE p.department = $department AND p.position <> $position RETURN p"
+    assert params == {"department": "Engineering", "position": "CEO"}
+
+
+def test_escaped_quotes_are_unescaped():
+    template, params, _ = parameterize("MATCH (p {full_name: 'O\\'Brien'}) RETURN p")
+    assert template == "MATCH (p {full_name: $full_name}) RETURN p"
+    assert params == {"full_name": "O'Brien"}
+
+
+def test_existing_parameters_are_not_reused():
+    template, params, _ = parameterize(
+        "MATCH (p {full_name: $full_name})-[:WORKS_ON]->(j {name: 'X'}) WHERE p.id = '7' RETURN j",
+        {"full_name": "A"})
+    assert "$full_name_2" not in template
+    assert params == {"full_name": "A", "name": "X", "id": "7"}
+
+
+def test_repeated_keys_get_distinct_names():
+    template, params, _ = parameterize(
+        "MATCH (a {full_name: 'A'})-[:IS_TECH_MENTOR_OF]->(b {full_name: 'B'}) RETURN b")
+    assert template == ("MATCH (a {full_name: $full_name})-[:IS_TECH_MENTOR_OF]->"
+                        "(b {full_name: $full_name_2}) RETURN b")
+    assert params == {"full_name": "A", "full_name_2": "B"}
+
+
+def test_numbers_are_lifted_with_their_type():
+    template, params, lifted = parameterize("MATCH (n) WHERE n.score > 1.5 AND n.age = 30 RETURN n")
+    assert template == "MATCH (n) WHERE n.score > $score AND n.age = $age RETURN n"
+    assert params == {"score": 1.5, "age": 30}
+    assert lifted == 2
+
+
+@pytest.mark.parametrize("cypher", [
+    "MATCH (p {full_name: $name})-[:IS_CAREER_MENTOR_OF*1..3]->(m) RETURN m",
+    "MATCH (p {full_name: $name})-[:IS_CAREER_MENTOR_OF*2]->(m) RETURN m",
+    "MATCH (n) RETURN n // limit 'x' 5",
+    "MATCH (n:`Label 1`) RETURN n",
+])
+def test_literals_that_cannot_be_parameters_are_kept(cypher):
+    assert parameterize(cypher) == (cypher, {}, 0)
+
+
+def test_integer_row_counts_are_lifted():
+    template, params, _ = parameterize("MATCH (n) RETURN n SKIP 5 LIMIT 10")
+    assert template == "MATCH (n) RETURN n SKIP $p0 LIMIT $p1"
+    assert params == {"p0": 5, "p1": 10}
+
+
+@pytest.mark.parametrize("cypher", [
+    "MATCH (n) RETURN n LIMIT 1e2",
+    "MATCH (n) RETURN n skip 2.0",
+])
+def test_non_integer_row_counts_stay_inline(cypher):
+    assert parameterize(cypher) == (cypher, {}, 0)
+
+
+def test_unterminated_string_is_kept():
+    assert parameterize("MATCH (n {name: 'abc") == ("MATCH (n {name: 'abc", {}, 0)
+
+
+def test_templates_estimate_plan_cache_hits():
+    templates = QueryTemplates(plan_cache_size=10)
+    for name in ("A", "B", "C"):
+        raw = f"MATCH (p {{full_name: '{name}'}}) RETURN p"
+        templates.record(raw, *parameterize(raw)[::2])
+    stats = templates.stats()
+    assert stats["templates"] == 1
+    assert stats["estimated_plan_cache"]["hits"] == 2
+    assert stats["estimated_plan_cache_without_parameters"]["hits"] == 0
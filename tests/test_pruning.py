@@ -0,0 +1,53 @@
+import pytest
+
+from src.llm.pruning import SchemaPruner
+
+PERSON = [{"property": "full_name", "type": "STRING"}, {"property": "id", "type": "STRING"},
+          {"property": "department", "type": "STRING"}, {"property": "position", "type": "STRING"}]
+SCHEMA = {
+    "node_props": {"Person": PERSON, "Project": [{"property": "name", "type": "STRING"}]},
+    "rel_props": {},
+    "relationships": [
+        {"start": "Person", "type": rel_type, "end": "Person"}
+        for rel_type in ("IS_CAREER_MENTOR_OF", "IS_CAREER_MENTEE_OF",
+                         "IS_TECH_MENTOR_OF", "IS_TECH_MENTEE_OF")
+    ] + [{"start": "Person", "type": "WORKS_ON", "end": "Project"}],
+}
+
+
+def relationship_types(schema: str):
+    return {line.split("[:")[1].split("]")[0]
+            for line in schema.split("The relationships:")[1].splitlines() if "[:" in line}
+
+
+@pytest.mark.parametrize("question", [
+    "Who reports to Rebecca Carroll?",
+    "Who is under Rebecca Carroll?",
+    "Who is Rebecca Carroll's manager?",
+])
+def test_reporting_line_keeps_career_mentorship(question):
+    schema = SchemaPruner(SCHEMA).prune(question, ["person"])
+    assert "IS_CAREER_MENTOR_OF" in relationship_types(schema)
+
+
+@pytest.mark.parametrize("question", [
+    "Who are Rebecca Carroll's colleagues?",
+    "What department is Rebecca Carroll in?",
+])
+def test_no_matching_relationship_keeps_all(question):
+    schema = SchemaPruner(SCHEMA).prune(question, ["person"])
+    assert relationship_types(schema) == {rel["type"] for rel in SCHEMA["relationships"]}
+
+
+def test_matching_relationship_is_pruned():
+    schema = SchemaPruner(SCHEMA).prune("Who is Rebecca Carroll's tech mentor?", ["person"])
+    assert relationship_types(schema) == {"IS_TECH_MENTOR_OF", "IS_TECH_MENTEE_OF"}
+
+
+@pytest.mark.parametrize("question, prop", [
+    ("Who works in Engineering?", "department"),
+    ("List all Senior Developers", "position"),
+])
+def test_value_filters_keep_every_property(question, prop):
+    schema = SchemaPruner(SCHEMA).prune(question, ())
+    assert f"{prop}: STRING" in schema